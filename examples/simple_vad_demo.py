@@ -7,17 +7,46 @@ voice activity detection and energy thresholds. This is completely
 offline and requires no external models or internet connection.
 
 Requirements:
-    pip install pyaudio numpy
+    pip install sounddevice numpy
+    pip install numba      # optional, compiled per-chunk energy kernel
 
 Usage:
     python simple_vad_demo.py
 """
 
-import pyaudio
+import sounddevice as sd
 import numpy as np
 import time
 import threading
-from collections import deque
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _chunk_sums_i16(samples, chunk_size):
+        """Per-chunk sums of squares of int16 samples in one compiled loop."""
+        chunks = samples.shape[0] // chunk_size
+        sums = np.empty(chunks, dtype=np.int64)
+        for i in range(chunks):
+            total = 0
+            for j in range(i * chunk_size, (i + 1) * chunk_size):
+                value = np.int64(samples[j])
+                total += value * value
+            sums[i] = total
+        return sums
+
+    # Compile (or load from cache) at import rather than on the first chunk
+    _chunk_sums_i16(np.zeros(1, dtype=np.int16), 1)
+else:
+    def _chunk_sums_i16(samples, chunk_size):
+        """Per-chunk sums of squares of int16 samples."""
+        chunks = samples.astype(np.int64).reshape(-1, chunk_size)
+        # Fused multiply-accumulate per row, no squared temporary
+        return np.einsum('ij,ij->i', chunks, chunks)
 
 class SimpleVADDetector:
     """Simple voice activity detector for wake word detection."""
@@ -27,7 +56,9 @@ class SimpleVADDetector:
                  chunk_size=1024,
                  energy_threshold=500,
                  silence_duration=1.0,
-                 speech_duration=0.5):
+                 speech_duration=0.5,
+                 auto_tune_chunk=False,
+                 max_chunk_size=8192):
         """
         Initialize simple VAD detector.
         
@@ -37,15 +68,22 @@ class SimpleVADDetector:
             energy_threshold: Energy threshold for speech detection
             silence_duration: Duration of silence before considering speech ended
             speech_duration: Minimum duration of speech to trigger
+            auto_tune_chunk: Calibrate chunk_size against measured CPU time at startup
+            max_chunk_size: Upper bound for the auto-tuned chunk size
         """
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.energy_threshold = energy_threshold
         self.silence_duration = silence_duration
         self.speech_duration = speech_duration
+        self.auto_tune_chunk = auto_tune_chunk
+        self.max_chunk_size = max_chunk_size
+        
+        # Threshold in the raw sum-of-squares domain (energy * N), so the
+        # hot loop compares integers without dividing per chunk
+        self._thresh_times_n = int(energy_threshold) * chunk_size
         
         # Audio processing
-        self.audio = None
         self.stream = None
         self.running = False
         
@@ -53,7 +91,12 @@ class SimpleVADDetector:
         self.speech_start_time = None
         self.last_speech_time = None
         self.is_speaking = False
-        self.energy_history = deque(maxlen=10)  # Keep last 10 energy values
+        # Last 10 raw energy values as a ring with a running sum (O(1) mean)
+        self.energy_history = [0] * 10
+        self._energy_index = 0
+        self._energy_count = 0
+        self._energy_sum = 0
+        self._next_print_time = 0.0
         
         # Callbacks
         self.on_speech_start = None
@@ -62,14 +105,9 @@ class SimpleVADDetector:
     def initialize(self):
         """Initialize audio system."""
         try:
-            self.audio = pyaudio.PyAudio()
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
+            self._open_stream()
+            if self.auto_tune_chunk:
+                self._tune_chunk_size()
             
             print("✅ Simple VAD detector initialized successfully!")
             return True
@@ -78,10 +116,62 @@ class SimpleVADDetector:
             print(f"❌ Failed to initialize audio: {e}")
             return False
     
-    def calculate_energy(self, audio_data):
-        """Calculate energy of audio chunk."""
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        return np.sum(audio_array.astype(np.float32) ** 2) / len(audio_array)
+    def _open_stream(self):
+        """Open and start the input stream for the current chunk size."""
+        # InputStream.read() hands back int16 ndarrays, no bytes round-trip
+        self.stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='int16',
+            blocksize=self.chunk_size
+        )
+        self.stream.start()
+    
+    def _set_chunk_size(self, chunk_size):
+        """Reopen the stream with a new chunk size, keeping the threshold in sync."""
+        self.stream.stop()
+        self.stream.close()
+        self.chunk_size = chunk_size
+        self._thresh_times_n = int(self.energy_threshold) * chunk_size
+        self._open_stream()
+    
+    def _tune_chunk_size(self, calibration_chunks=10):
+        """
+        Grow or shrink chunk_size until per-chunk processing is a small,
+        safe fraction of the chunk period. Durations stay in seconds, so
+        the VAD timing semantics are unchanged.
+        """
+        while True:
+            busy = 0.0
+            for _ in range(calibration_chunks):
+                samples, _overflowed = self.stream.read(self.chunk_size)
+                start = time.perf_counter()
+                self._raw_energies(samples)
+                busy += time.perf_counter() - start
+            
+            utilization = busy / (calibration_chunks * self.chunk_size / self.sample_rate)
+            if utilization < 0.05 and self.chunk_size * 2 <= self.max_chunk_size:
+                self._set_chunk_size(self.chunk_size * 2)
+            elif utilization > 0.30 and self.chunk_size >= 512:
+                self._set_chunk_size(self.chunk_size // 2)
+                break
+            else:
+                break
+        
+        print(f"🎯 Tuned chunk size: {self.chunk_size} samples")
+    
+    def _raw_energies(self, samples):
+        """Per-chunk sums of squares (energy * N) of a multi-chunk read, in integers."""
+        return _chunk_sums_i16(samples.reshape(-1), self.chunk_size)
+    
+    def _record_energy(self, raw_energy):
+        """Store a raw energy in the history ring, updating the running sum."""
+        index = self._energy_index
+        self._energy_sum += raw_energy - self.energy_history[index]
+        self.energy_history[index] = raw_energy
+        self._energy_index = (index + 1) % len(self.energy_history)
+        if self._energy_count < len(self.energy_history):
+            self._energy_count += 1
     
     def start_listening(self):
         """Start listening for voice activity."""
@@ -97,54 +187,57 @@ class SimpleVADDetector:
         
         try:
             while self.running:
-                # Read audio chunk
-                audio_data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-                
-                # Calculate energy
-                energy = self.calculate_energy(audio_data)
-                self.energy_history.append(energy)
+                # Drain every whole chunk already buffered in one read
+                available = self.stream.read_available
+                frames = max(self.chunk_size, available - available % self.chunk_size)
+                samples, _overflowed = self.stream.read(frames)
                 
-                # Determine if speech is detected
-                speech_detected = energy > self.energy_threshold
+                # Raw energy of every chunk in the batch in one reduction
                 current_time = time.time()
-                
-                if speech_detected:
-                    if not self.is_speaking:
-                        # Speech started
-                        self.speech_start_time = current_time
-                        self.is_speaking = True
-                        print(f"🎤 Speech started (energy: {energy:.0f})")
-                        
-                        if self.on_speech_start:
-                            self.on_speech_start()
+                for raw_energy in self._raw_energies(samples).tolist():
+                    self._record_energy(raw_energy)
+                    
+                    # Determine if speech is detected
+                    speech_detected = raw_energy > self._thresh_times_n
                     
-                    self.last_speech_time = current_time
-                else:
-                    if self.is_speaking:
-                        # Check if silence duration has passed
-                        if current_time - self.last_speech_time > self.silence_duration:
-                            # Speech ended
-                            speech_duration = current_time - self.speech_start_time
+                    if speech_detected:
+                        if not self.is_speaking:
+                            # Speech started
+                            self.speech_start_time = current_time
+                            self.is_speaking = True
+                            print(f"🎤 Speech started (energy: {raw_energy / self.chunk_size:.0f})")
                             
-                            if speech_duration >= self.speech_duration:
-                                print(f"🎯 Speech detected! Duration: {speech_duration:.2f}s")
-                                print(f"   → This is where you'd start your voice processing pipeline")
-                                print(f"   → You could add keyword detection here (e.g., 'Jarvis')\n")
+                            if self.on_speech_start:
+                                self.on_speech_start()
+                        
+                        self.last_speech_time = current_time
+                    else:
+                        if self.is_speaking:
+                            # Check if silence duration has passed
+                            if current_time - self.last_speech_time > self.silence_duration:
+                                # Speech ended
+                                speech_duration = current_time - self.speech_start_time
                                 
-                                if self.on_speech_end:
-                                    self.on_speech_end(speech_duration)
-                            else:
-                                print(f"🔇 Speech too short: {speech_duration:.2f}s (ignored)")
-                            
-                            self.is_speaking = False
-                            self.speech_start_time = None
-                
-                # Print energy level occasionally
-                if int(current_time) % 5 == 0 and int(current_time) != int(getattr(self, '_last_print_time', 0)):
-                    avg_energy = np.mean(list(self.energy_history))
-                    print(f"📊 Energy: {energy:.0f} (avg: {avg_energy:.0f}, threshold: {self.energy_threshold})")
-                    self._last_print_time = current_time
+                                if speech_duration >= self.speech_duration:
+                                    print(f"🎯 Speech detected! Duration: {speech_duration:.2f}s")
+                                    print(f"   → This is where you'd start your voice processing pipeline")
+                                    print(f"   → You could add keyword detection here (e.g., 'Jarvis')\n")
+                                    
+                                    if self.on_speech_end:
+                                        self.on_speech_end(speech_duration)
+                                else:
+                                    print(f"🔇 Speech too short: {speech_duration:.2f}s (ignored)")
+                                
+                                self.is_speaking = False
+                                self.speech_start_time = None
                     
+                    # Print energy level occasionally
+                    if current_time >= self._next_print_time:
+                        energy = raw_energy / self.chunk_size
+                        avg_energy = self._energy_sum / self._energy_count / self.chunk_size
+                        print(f"📊 Energy: {energy:.0f} (avg: {avg_energy:.0f}, threshold: {self.energy_threshold})")
+                        self._next_print_time = current_time + 5.0
+                        
         except KeyboardInterrupt:
             print("\n👋 Stopping...")
         except Exception as e:
@@ -157,10 +250,9 @@ class SimpleVADDetector:
         self.running = False
         
         if self.stream:
-            self.stream.stop_stream()
+            self.stream.stop()
             self.stream.close()
-        if self.audio:
-            self.audio.terminate()
+            self.stream = None
         
         print("🔇 Listening stopped")
     
@@ -7,45 +7,132 @@ Vosk is a completely offline speech recognition toolkit that can be used
 for wake word detection without any internet connection.
 
 Requirements:
-    pip install vosk pyaudio
+    pip install vosk sounddevice numpy
+    pip install orjson          # optional, faster result parsing
+    pip install faster-whisper  # optional, GPU backend (used when CUDA is present)
 
 Usage:
-    python vosk_demo.py
+    python vosk_demo.py [--profile]
 """
 
 import json
-import pyaudio
+import os
+import re
+import numpy as np
+import sounddevice as sd
 import vosk
 import sys
 import time
+import statistics
 import threading
-from queue import Queue
+from collections import deque
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Vosk result JSON has a fixed shape; pull the one field we need directly
+_TEXT_RE = re.compile(r'"text"\s*:\s*"([^"\\]*)"')
+_PARTIAL_RE = re.compile(r'"partial"\s*:\s*"([^"\\]*)"')
+
+def _result_field(raw, pattern, key):
+    """Extract a string field from a Vosk result, parsing JSON only as a fallback."""
+    match = pattern.search(raw)
+    if match:
+        return match.group(1)
+    # Escaped characters or an unexpected layout: let the JSON parser handle it
+    return json_loads(raw).get(key, '')
+
+BLOCK_SIZE = 4000  # samples per audio block (250 ms at 16 kHz)
+POOL_SIZE = 8      # preallocated audio blocks shared by callback and consumer
+WHISPER_WINDOW_BLOCKS = 8  # faster-whisper transcribes at most 2 s of speech at a time
+_INT16_SCALE = np.float32(1 / 32768)
+
+def _cuda_available():
+    """True if faster-whisper is installed and CTranslate2 sees a CUDA device."""
+    try:
+        import ctranslate2
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        return False
+    return ctranslate2.get_cuda_device_count() > 0
 
 class VoskWakeWordDetector:
     """Simple wake word detector using Vosk."""
     
-    def __init__(self, model_path=None, wake_words=["jarvis", "hey jarvis"]):
+    def __init__(self, model_path=None, wake_words=["jarvis", "hey jarvis"],
+                 noise_gate_ratio=3.0, noise_floor_alpha=0.01,
+                 max_silence_frames=8, backend="auto",
+                 whisper_model="tiny.en", profile=False):
         """
         Initialize Vosk wake word detector.
         
         Args:
             model_path: Path to Vosk model (if None, will try to download)
             wake_words: List of wake words to detect
+            noise_gate_ratio: Frames below noise_floor * ratio skip Vosk decoding
+            noise_floor_alpha: EMA factor for the adaptive noise floor
+            max_silence_frames: Gated frames in a row before Vosk state is flushed
+            backend: "vosk", "faster_whisper", or "auto" (faster-whisper on GPU if available)
+            whisper_model: faster-whisper model name for the faster_whisper backend
+            profile: Time the hot sections and print p50/p99 when listening stops
         """
         self.wake_words = [word.lower() for word in wake_words]
+        # Single-pass matcher over all wake words (longest first so
+        # "hey jarvis" wins over "jarvis" at the same position)
+        self._wake_pattern = re.compile("|".join(
+            re.escape(word) for word in sorted(self.wake_words, key=len, reverse=True)
+        ))
         self.model_path = model_path
         self.model = None
         self.recognizer = None
-        self.audio = None
+        self.backend = backend
+        self.whisper_model = whisper_model
+        self.whisper = None
+        # Gated speech waiting for faster-whisper, converted to float32 one
+        # block at a time into a preallocated window
+        self._speech = np.empty(WHISPER_WINDOW_BLOCKS * BLOCK_SIZE, dtype=np.float32)
+        self._speech_len = 0
         self.stream = None
         self.running = False
-        self.detection_queue = Queue()
+        self.detection_queue = deque(maxlen=32)  # single consumer, no lock needed
+        self._detection_ready = threading.Event()
+        
+        # Audio callback -> recognizer hand-off through a preallocated pool:
+        # the callback fills a free block and publishes its index, the
+        # consumer hands the index back once Vosk is done with it
+        self._pool = [bytearray(BLOCK_SIZE * 2) for _ in range(POOL_SIZE)]
+        self._pool_views = [memoryview(block) for block in self._pool]
+        self._free = deque(range(POOL_SIZE))
+        self._frames = deque()
+        self._frames_ready = threading.Event()
+        # Stream status flags noted by the callback, printed by the consumer
+        self._status_log = deque(maxlen=64)
+        self._next_partial_print = 0.0
+        
+        # Energy gate in front of the recognizer
+        self.noise_gate_ratio = noise_gate_ratio
+        self.noise_floor_alpha = noise_floor_alpha
+        self.max_silence_frames = max_silence_frames
+        self.noise_floor = None
+        self._silence_frames = 0
+        
+        # Per-section timings in ns, newest 10000 samples each
+        self.profile = profile
+        self._timings = {section: deque(maxlen=10000)
+                         for section in ("enqueue", "vosk", "parse", "match")}
         
     def initialize(self):
         """Initialize Vosk model and audio."""
         try:
-            # Initialize Vosk model
-            if self.model_path:
+            if self.backend == "auto":
+                self.backend = "faster_whisper" if _cuda_available() else "vosk"
+            
+            if self.backend == "faster_whisper":
+                self._initialize_whisper()
+            elif self.model_path:
+                # Initialize Vosk model
                 self.model = vosk.Model(self.model_path)
             else:
                 # Try to use a small model (you'll need to download this)
@@ -54,25 +141,175 @@ class VoskWakeWordDetector:
                 print("\tExample: wget https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip")
                 return False
             
-            self.recognizer = vosk.KaldiRecognizer(self.model, 16000)
+            if self.backend == "vosk":
+                self.recognizer = vosk.KaldiRecognizer(self.model, 16000)
+                # Minimal result JSON: no per-word timestamps to build or parse
+                self.recognizer.SetWords(False)
             
-            # Initialize PyAudio
-            self.audio = pyaudio.PyAudio()
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
+            self.stream = sd.RawInputStream(
+                samplerate=16000,
                 channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=8000
+                dtype='int16',
+                blocksize=BLOCK_SIZE,
+                callback=self._audio_callback
             )
+            self.stream.start()
             
-            print("\tVosk wake word detector initialized successfully!")
+            print(f"\tWake word detector initialized successfully! (backend: {self.backend})")
             return True
             
         except Exception as e:
             print(f"\tFailed to initialize Vosk: {e}")
             return False
     
+    def _initialize_whisper(self):
+        """Load faster-whisper, quantized for the device it runs on."""
+        import ctranslate2
+        from faster_whisper import WhisperModel
+        
+        if ctranslate2.get_cuda_device_count() > 0:
+            device, compute_type = "cuda", "int8_float16"
+        else:
+            device, compute_type = "cpu", "int8"
+        self.whisper = WhisperModel(self.whisper_model, device=device, compute_type=compute_type)
+    
+    def _transcribe_speech(self):
+        """Run faster-whisper on the buffered speech and check it for wake words."""
+        # A view is fine: transcribe() is done with it before the window refills
+        samples = self._speech[:self._speech_len]
+        self._speech_len = 0
+        segments, _info = self.whisper.transcribe(samples, language="en", beam_size=1)
+        text = " ".join(segment.text for segment in segments).lower().strip()
+        if text:
+            self._check_text(text)
+    
+    def _process_block_whisper(self, data):
+        """Buffer gated speech and transcribe it at pauses or every 2 s."""
+        if self._is_silence(data):
+            # The energy gate already did the VAD work: no GPU time on silence
+            if self._speech_len:
+                self._transcribe_speech()
+            return
+        
+        # int16 -> [-1, 1) float32 written straight into the window, no temporaries
+        block = np.frombuffer(data, dtype=np.int16)
+        end = self._speech_len + block.size
+        np.multiply(block, _INT16_SCALE, out=self._speech[self._speech_len:end])
+        self._speech_len = end
+        if end >= self._speech.size:
+            self._transcribe_speech()
+    
+    def calculate_energy(self, audio_data):
+        """Calculate energy (mean square) of audio chunk."""
+        # float64 dot is exact for int16 chunks and runs as a single BLAS pass
+        samples = np.frombuffer(audio_data, dtype=np.int16).astype(np.float64)
+        return float(np.dot(samples, samples)) / samples.size
+    
+    def _is_silence(self, audio_data):
+        """Cheap first stage: True if the chunk is below the adaptive noise floor."""
+        energy = self.calculate_energy(audio_data)
+        if self.noise_floor is None:
+            self.noise_floor = max(energy, 1.0)
+            return False
+        
+        if energy < self.noise_floor * self.noise_gate_ratio:
+            # Only track the floor on background frames
+            self.noise_floor += self.noise_floor_alpha * (energy - self.noise_floor)
+            self.noise_floor = max(self.noise_floor, 1.0)
+            return True
+        return False
+    
+    def _check_text(self, text):
+        """Check recognized text for wake words."""
+        print(f"\tRecognized: '{text}'")
+        
+        # Check if any wake word is in the recognized text
+        match = self._wake_pattern.search(text)
+        if match:
+            wake_word = match.group()
+            print(f"\tWAKE WORD DETECTED: '{wake_word}'")
+            print(f"\tFull text: '{text}'")
+            print(f"\tTime: {time.strftime('%H:%M:%S')}")
+            print("\t-> This is where you'd start your voice processing pipeline\n")
+            
+            # Queue the detection
+            self.detection_queue.append({
+                'wake_word': wake_word,
+                'full_text': text,
+                'timestamp': time.time()
+            })
+            self._detection_ready.set()
+    
+    def _audio_callback(self, indata, frames, time_info, status):
+        """Copy the block into a free pool slot; no allocation on the audio thread."""
+        started = time.perf_counter_ns()
+        if status:
+            self._status_log.append(status)
+        try:
+            index = self._free.popleft()
+        except IndexError:
+            # Vosk is behind and every block is in flight: drop this one
+            return
+        self._pool_views[index][:] = indata
+        self._frames.append(index)
+        self._frames_ready.set()
+        if self.profile:
+            self._timings["enqueue"].append(time.perf_counter_ns() - started)
+    
+    def _process_block(self, data):
+        """Run the energy gate and Vosk on one audio block.
+        
+        Most of the time here is spent inside Kaldi (AcceptWaveform), so
+        Python-side changes only pay off when they remove whole steps such
+        as result parsing; run with profile=True to see the split.
+        """
+        # Skip Kaldi decoding on background noise
+        if self._is_silence(data):
+            self._silence_frames += 1
+            if self._silence_frames == self.max_silence_frames:
+                # Long gap: flush pending words and reset decoder state
+                text = _result_field(self.recognizer.FinalResult(), _TEXT_RE, 'text').lower().strip()
+                if text:
+                    self._check_text(text)
+                self.recognizer.Reset()
+            return
+        self._silence_frames = 0
+        
+        profile = self.profile
+        if profile:
+            started = time.perf_counter_ns()
+        accepted = self.recognizer.AcceptWaveform(bytes(data))
+        if profile:
+            self._timings["vosk"].append(time.perf_counter_ns() - started)
+        
+        if accepted:
+            if profile:
+                started = time.perf_counter_ns()
+            text = _result_field(self.recognizer.Result(), _TEXT_RE, 'text').lower().strip()
+            if profile:
+                self._timings["parse"].append(time.perf_counter_ns() - started)
+            
+            if text:
+                self._check_text(text)
+        else:
+            # Partial result: Vosk emits lowercase text, so a plain
+            # substring scan on the raw JSON skips parsing the common
+            # no-wake-word case
+            partial_raw = self.recognizer.PartialResult()
+            if profile:
+                started = time.perf_counter_ns()
+            found = self._wake_pattern.search(partial_raw)
+            if profile:
+                self._timings["match"].append(time.perf_counter_ns() - started)
+            if not found:
+                return
+            partial_text = _result_field(partial_raw, _PARTIAL_RE, 'partial').lower().strip()
+            now = time.monotonic()
+            if partial_text and now >= self._next_partial_print:
+                # At most 5 partial lines per second
+                self._next_partial_print = now + 0.2
+                print(f"Partial: '{partial_text}'", end='\r')
+    
     def start_listening(self):
         """Start listening for wake words."""
         if not self.initialize():
@@ -85,36 +322,24 @@ class VoskWakeWordDetector:
         
         try:
             while self.running:
-                data = self.stream.read(4000, exception_on_overflow=False)
+                while self._status_log:
+                    print(f"Audio stream status: {self._status_log.popleft()}")
                 
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get('text', '').lower().strip()
-                    
-                    if text:
-                        print(f"\tRecognized: '{text}'")
-                        
-                        # Check if any wake word is in the recognized text
-                        for wake_word in self.wake_words:
-                            if wake_word in text:
-                                print(f"\tWAKE WORD DETECTED: '{wake_word}'")
-                                print(f"\tFull text: '{text}'")
-                                print(f"\tTime: {time.strftime('%H:%M:%S')}")
-                                print("\t-> This is where you'd start your voice processing pipeline\n")
-                                
-                                # Queue the detection
-                                self.detection_queue.put({
-                                    'wake_word': wake_word,
-                                    'full_text': text,
-                                    'timestamp': time.time()
-                                })
-                                break
-                else:
-                    # Partial result
-                    partial = json.loads(self.recognizer.PartialResult())
-                    partial_text = partial.get('partial', '').lower().strip()
-                    if partial_text:
-                        print(f"Partial: '{partial_text}'", end='\r')
+                try:
+                    index = self._frames.popleft()
+                except IndexError:
+                    # Sleep until the audio callback publishes a block
+                    self._frames_ready.wait(timeout=0.5)
+                    self._frames_ready.clear()
+                    continue
+                
+                try:
+                    if self.backend == "faster_whisper":
+                        self._process_block_whisper(self._pool[index])
+                    else:
+                        self._process_block(self._pool[index])
+                finally:
+                    self._free.append(index)
                         
         except KeyboardInterrupt:
             print("\nStopping...")
@@ -128,19 +353,41 @@ class VoskWakeWordDetector:
         self.running = False
         
         if self.stream:
-            self.stream.stop_stream()
+            self.stream.stop()
             self.stream.close()
-        if self.audio:
-            self.audio.terminate()
+            self.stream = None
+        
+        # Return in-flight blocks to the pool
+        while self._frames:
+            self._free.append(self._frames.popleft())
+        
+        if self.profile:
+            self._print_timings()
         
         print("Listening stopped")
     
+    def _print_timings(self):
+        """Print p50/p99 latency of each profiled section."""
+        print("\tSection timings (us):")
+        for section, samples in self._timings.items():
+            if len(samples) < 2:
+                continue
+            percentiles = statistics.quantiles(samples, n=100)
+            print(f"\t  {section:8s} p50={percentiles[49] / 1000:8.1f}  "
+                  f"p99={percentiles[98] / 1000:8.1f}  (n={len(samples)})")
+    
     def get_detection(self, timeout=None):
         """Get the next wake word detection."""
-        try:
-            return self.detection_queue.get(timeout=timeout)
-        except:
-            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.detection_queue.popleft()
+            except IndexError:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._detection_ready.wait(timeout=remaining)
+                self._detection_ready.clear()
 
 def main():
     """Main demo function."""
@@ -163,7 +410,9 @@ def main():
     # Create detector
     detector = VoskWakeWordDetector(
         model_path=model_path,
-        wake_words=["jarvis", "hey jarvis", "okay jarvis"]
+        wake_words=["jarvis", "hey jarvis", "okay jarvis"],
+        backend=os.environ.get("STT_BACKEND", "auto"),  # vosk | faster_whisper | auto
+        profile="--profile" in sys.argv
     )
     
     try:
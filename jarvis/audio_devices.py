@@ -0,0 +1,56 @@
+"""
+Audio device selection.
+
+PortAudio's default device usually sits behind the slowest host API on the
+machine: MME on Windows, PulseAudio on Linux. Each adds 50-100 ms of mixer
+buffering. find_device() picks the default device of a lower-latency host
+API instead, provided that device accepts our stream settings.
+"""
+from typing import Optional, Tuple
+
+import sounddevice as sd
+
+# Lowest latency first. Names are matched case-insensitively as substrings
+# of sd.query_hostapis()[i]["name"] (e.g. "Windows WASAPI", "Core Audio").
+HOST_API_PREFERENCE = ("ASIO", "WASAPI", "Core Audio", "ALSA")
+
+
+def _candidates(host_api: str, kind: str, exclusive: bool):
+    """Yield (device index, extra_settings) for host APIs whose name contains host_api."""
+    for api in sd.query_hostapis():
+        if host_api.lower() not in api["name"].lower():
+            continue
+        device = api[f"default_{kind}_device"]
+        if device < 0:
+            continue
+        if exclusive and "WASAPI" in api["name"]:
+            # Exclusive mode bypasses the Windows mixer, but no other
+            # application can use the device while the stream is open
+            yield device, sd.WasapiSettings(exclusive=True)
+        yield device, None
+
+
+def find_device(kind: str, host_api: Optional[str] = None, exclusive: bool = False,
+                **settings) -> Tuple[Optional[int], object]:
+    """
+    Pick an audio device from the lowest-latency host API that supports the stream.
+
+    Args:
+        kind: "input" or "output"
+        host_api: Host API name to use instead of HOST_API_PREFERENCE (e.g. "WASAPI")
+        exclusive: Try WASAPI exclusive mode before shared mode
+        **settings: Stream settings to check (samplerate, channels, dtype)
+
+    Returns:
+        (device index, extra_settings) to pass to the stream. The device is
+        PortAudio's default (None) when no preferred host API fits.
+    """
+    check = sd.check_input_settings if kind == "input" else sd.check_output_settings
+    for name in ([host_api] if host_api else HOST_API_PREFERENCE):
+        for device, extra_settings in _candidates(name, kind, exclusive):
+            try:
+                check(device=device, extra_settings=extra_settings, **settings)
+            except Exception:
+                continue
+            return device, extra_settings
+    return None, None
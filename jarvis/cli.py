@@ -9,13 +9,27 @@ Usage:
     jarvis output-type        # Show current output mode
 """
 
+import gc
+import logging
 import sys
 import os
+import re
 from pathlib import Path
-from .config import Config
+from typing import Any, Callable, Dict, List
 
 
-ENV_FILE = Path(__file__).parent / ".env"
+_PACKAGE_DIR = Path(__file__).parent
+ENV_FILE = _PACKAGE_DIR / ".env"
+TEMPLATE_FILE = _PACKAGE_DIR / "config.env.template"
+
+# Converters from .env strings to the types Config exposes, so updated
+# attributes keep the same type as the ones read at startup
+_ENV_COERCERS: Dict[str, Callable[[str], Any]] = {
+    "RESET_HISTORY_AFTER_RESPONSE": lambda value: value.lower() == "true",
+    "SUPERMCP_TIMEOUT": int,
+    "VOICE_ACTIVATION_SENSITIVITY": float,
+    "WAKE_WORDS": lambda value: tuple(value.split(",")),
+}
 
 
 def set_output_mode(mode: str) -> None:
@@ -55,37 +69,37 @@ def _update_env_setting(key: str, value: str) -> None:
     """
     # Read current .env or config.env.template
     if ENV_FILE.exists():
-        lines = ENV_FILE.read_text().splitlines()
+        data = ENV_FILE.read_bytes()
     else:
         # If .env doesn't exist, try template
-        template_file = Path(__file__).parent / "config.env.template"
-        if template_file.exists():
+        if TEMPLATE_FILE.exists():
             print(f"Creating .env from template...")
-            lines = template_file.read_text().splitlines()
+            data = TEMPLATE_FILE.read_bytes()
         else:
-            lines = []
+            data = b""
     
-    # Update or add setting
-    found = False
-    for i, line in enumerate(lines):
-        if line.startswith(f"{key}=") or line.startswith(f"#{key}="):
-            lines[i] = f"{key}={value}"
-            found = True
-            break
+    # Update the first (possibly commented-out) setting in one regex pass
+    line = f"{key}={value}".encode()
+    pattern = re.compile(rb"(?m)^#?" + re.escape(key.encode()) + rb"=.*$")
+    data, found = pattern.subn(lambda _match: line, data, count=1)
     
     if not found:
-        lines.append(f"{key}={value}")
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        data += line + b"\n"
     
     # Write back to .env
-    ENV_FILE.write_text("\n".join(lines) + "\n")
+    ENV_FILE.write_bytes(data)
     
     # Update current process environment
+    from .config import Config
     os.environ[key] = value
-    setattr(Config, key, value)
+    setattr(Config, key, _ENV_COERCERS.get(key, str)(value))
 
 
 def get_output_mode() -> str:
     """Get current output mode from config"""
+    from .config import Config
     return Config.OUTPUT_MODE
 
 
@@ -111,72 +125,104 @@ def show_usage() -> None:
     print("  jarvis output-type        # Check current mode")
 
 
+def _cmd_output_type(args: List[str]) -> None:
+    """Show the current output mode"""
+    mode = get_output_mode()
+    print(f"Current output mode: {mode}")
+
+
+def _cmd_history_reset(args: List[str]) -> None:
+    """Show or set the history reset setting"""
+    if len(args) == 0:
+        # Show current setting
+        from .config import Config
+        enabled = Config.RESET_HISTORY_AFTER_RESPONSE
+        print(f"History reset: {'enabled' if enabled else 'disabled'}")
+    elif len(args) == 1:
+        # Set new value
+        value = args[0].lower()
+        if value in _ENABLE_VALUES:
+            set_history_reset(True)
+        elif value in _DISABLE_VALUES:
+            set_history_reset(False)
+        else:
+            print(f"Error: Invalid value '{value}'. Use 'on' or 'off'")
+            sys.exit(1)
+    else:
+        print("Usage: jarvis history-reset [on|off]")
+        sys.exit(1)
+
+
+def _cmd_ask(args: List[str]) -> None:
+    """Ask JARVIS a question in text mode"""
+    if not args:
+        print("Error: Message required")
+        print("Usage: jarvis ask \"<message>\"")
+        sys.exit(1)
+    
+    # Combine all remaining arguments as the message
+    message = " ".join(args)
+    
+    # Initialize JARVIS in text mode (skip voice components)
+    from .main import Jarvis
+    jarvis = Jarvis(text_mode=True)
+    # ask() now handles output based on Config.OUTPUT_MODE
+    try:
+        jarvis.ask(message)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+_ENABLE_VALUES = frozenset({"on", "true", "1", "yes", "enable"})
+_DISABLE_VALUES = frozenset({"off", "false", "0", "no", "disable"})
+
+# CLI surface: command name -> handler taking the remaining arguments
+_COMMANDS: Dict[str, Callable[[List[str]], None]] = {
+    "text": lambda args: set_output_mode("text"),
+    "voice": lambda args: set_output_mode("voice"),
+    "output-type": _cmd_output_type,
+    "history-reset": _cmd_history_reset,
+    "ask": _cmd_ask,
+    "-h": lambda args: show_usage(),
+    "--help": lambda args: show_usage(),
+    "help": lambda args: show_usage(),
+}
+
+
 def main() -> None:
     """Main CLI entry point"""
-    # Import here to avoid circular imports and to delay heavy imports
-    from .main import Jarvis
+    # JARVIS_LOG=INFO or DEBUG shows voice pipeline status messages
+    logging.basicConfig(
+        level=os.getenv("JARVIS_LOG", "WARNING").upper(),
+        format="%(message)s"
+    )
     
     # No arguments - start voice activation
     if len(sys.argv) == 1:
+        # Import here to avoid circular imports and to delay heavy imports
+        from .main import Jarvis
         print("Starting JARVIS in voice activation mode...")
-        jarvis = Jarvis()
-        jarvis.listen_with_activation()
+        with Jarvis() as jarvis:
+            # Everything allocated during startup (modules, models, prompts)
+            # lives for the whole session. Freezing it keeps the garbage
+            # collector from rescanning it, so collections stay short and
+            # don't stall the audio and speech threads
+            gc.freeze()
+            jarvis.listen_with_activation()
         return
     
     # Parse command
     command = sys.argv[1]
     
-    if command == "text":
-        set_output_mode("text")
-        
-    elif command == "voice":
-        set_output_mode("voice")
-        
-    elif command == "output-type":
-        mode = get_output_mode()
-        print(f"Current output mode: {mode}")
-        
-    elif command == "history-reset":
-        if len(sys.argv) == 2:
-            # Show current setting
-            enabled = Config.RESET_HISTORY_AFTER_RESPONSE
-            print(f"History reset: {'enabled' if enabled else 'disabled'}")
-        elif len(sys.argv) == 3:
-            # Set new value
-            value = sys.argv[2].lower()
-            if value in ["on", "true", "1", "yes", "enable"]:
-                set_history_reset(True)
-            elif value in ["off", "false", "0", "no", "disable"]:
-                set_history_reset(False)
-            else:
-                print(f"Error: Invalid value '{value}'. Use 'on' or 'off'")
-                sys.exit(1)
-        else:
-            print("Usage: jarvis history-reset [on|off]")
-            sys.exit(1)
-        
-    elif command == "ask":
-        if len(sys.argv) < 3:
-            print("Error: Message required")
-            print("Usage: jarvis ask \"<message>\"")
-            sys.exit(1)
-        
-        # Combine all remaining arguments as the message
-        message = " ".join(sys.argv[2:])
-        
-        # Initialize JARVIS in text mode (skip voice components)
-        jarvis = Jarvis(text_mode=True)
-        # ask() now handles output based on Config.OUTPUT_MODE
-        jarvis.ask(message)
-        
-    elif command in ["-h", "--help", "help"]:
-        show_usage()
-        
-    else:
+    handler = _COMMANDS.get(command)
+    if handler is None:
         print(f"Error: Unknown command '{command}'")
         print()
         show_usage()
         sys.exit(1)
+    
+    handler(sys.argv[2:])
 
 
 if __name__ == "__main__":
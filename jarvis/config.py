@@ -1,31 +1,126 @@
 from dotenv import load_dotenv
+from functools import cached_property
 # import multiprocessing
 import os
+import shlex
 
-# Load .env file from the jarvis directory
-load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+# Load .env file from the jarvis directory (once per process tree)
+if not os.environ.get("_JARVIS_DOTENV_LOADED"):
+    load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+    os.environ["_JARVIS_DOTENV_LOADED"] = "1"
+
+class _Config:
+    """
+    Settings read from the environment on first access and cached.
+
+    Commands that only need one or two keys don't pay for parsing the rest.
+    Assigning an attribute (as the CLI does after editing .env) overrides
+    the cached value.
+    """
+
+    @classmethod
+    def from_env(cls) -> "_Config":
+        """A new Config with nothing cached, so it reads the environment as it is now."""
+        return cls()
 
-class Config:
     # Vosk STT Configuration
-    VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
-    LLM_MODEL = os.getenv("LLM_MODEL")
+    @cached_property
+    def VOSK_MODEL_PATH(self):
+        return os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+
+    # Legacy STT model setting from the Whisper-based config, kept so the
+    # single Config exposes every key older entry points and tests read
+    @cached_property
+    def STT_MODEL(self):
+        return os.getenv("STT_MODEL")
+
+    @cached_property
+    def LLM_MODEL(self):
+        return os.getenv("LLM_MODEL")
+
+    @cached_property
+    def LLM_KEEP_ALIVE(self):
+        return os.getenv("LLM_KEEP_ALIVE", "30m")  # e.g. "10m", "1h", "-1" = forever
+
+    @cached_property
+    def TTS_MODEL_ONNX(self):
+        return os.getenv("TTS_MODEL_ONNX")
+
+    @cached_property
+    def TTS_MODEL_JSON(self):
+        return os.getenv("TTS_MODEL_JSON")
+    
+    @cached_property
+    def TTS_QUANTIZED(self):
+        return os.getenv("TTS_QUANTIZED", "true").lower() == "true"
+
+    @cached_property
+    def TTS_TENSORRT(self):
+        return os.getenv("TTS_TENSORRT", "false").lower() == "true"
+
+    @cached_property
+    def TTS_THREADS(self):
+        return int(os.getenv("TTS_THREADS", "0"))  # 0 = half the usable CPUs
 
-    TTS_MODEL_ONNX = os.getenv("TTS_MODEL_ONNX")
-    TTS_MODEL_JSON = os.getenv("TTS_MODEL_JSON")
+    @cached_property
+    def AUDIO_HOST_API(self):
+        return os.getenv("AUDIO_HOST_API") or None  # None = lowest-latency available
+
+    @cached_property
+    def AUDIO_WASAPI_EXCLUSIVE(self):
+        return os.getenv("AUDIO_WASAPI_EXCLUSIVE", "false").lower() == "true"
     
     # Voice Activation Configuration
-    WAKE_WORDS = os.getenv("WAKE_WORDS", "jarvis,hey jarvis,okay jarvis").split(",")
-    VOICE_ACTIVATION_SENSITIVITY = float(os.getenv("VOICE_ACTIVATION_SENSITIVITY", "0.8"))
+    @cached_property
+    def WAKE_WORDS(self):
+        return tuple(os.getenv("WAKE_WORDS", "jarvis,hey jarvis,okay jarvis").split(","))
+
+    @cached_property
+    def VOICE_ACTIVATION_SENSITIVITY(self):
+        return float(os.getenv("VOICE_ACTIVATION_SENSITIVITY", "0.8"))
+
+    @cached_property
+    def VOICE_ACTIVATION_SILENCE_THRESHOLD(self):
+        return int(os.getenv("VOICE_ACTIVATION_SILENCE_THRESHOLD", "100"))  # RMS, 0 = off
+
+    @cached_property
+    def VOICE_ACTIVATION_GRAMMAR(self):
+        return os.getenv("VOICE_ACTIVATION_GRAMMAR", "true").lower() == "true"
     
     # CLI Output Mode Configuration
-    OUTPUT_MODE = os.getenv("OUTPUT_MODE", "voice")  # voice or text
+    @cached_property
+    def OUTPUT_MODE(self):
+        return os.getenv("OUTPUT_MODE", "voice")  # voice or text
     
     # Conversation History Configuration
-    RESET_HISTORY_AFTER_RESPONSE = os.getenv("RESET_HISTORY_AFTER_RESPONSE", "true").lower() == "true"
+    @cached_property
+    def RESET_HISTORY_AFTER_RESPONSE(self):
+        return os.getenv("RESET_HISTORY_AFTER_RESPONSE", "true").lower() == "true"
+
+    @cached_property
+    def LLM_HISTORY_TURNS(self):
+        return int(os.getenv("LLM_HISTORY_TURNS", "8"))  # user/assistant pairs kept
+
+    # Startup Configuration
+    @cached_property
+    def PARALLEL_INIT(self):
+        return os.getenv("PARALLEL_INIT", "true").lower() == "true"
+
+    # System Configuration
+    @cached_property
+    def SHELL_CMD(self):
+        # e.g. "bash -lc"; unset means detect the shell from PATH
+        shell = os.getenv("SHELL_CMD")
+        return tuple(shlex.split(shell)) if shell else None
 
     # SuperMCP Configuration
-    SUPERMCP_SERVER_PATH = os.getenv("SUPERMCP_SERVER_PATH", "SuperMCP/SuperMCP.py")
-    SUPERMCP_TIMEOUT = int(os.getenv("SUPERMCP_TIMEOUT", "60"))  # seconds
+    @cached_property
+    def SUPERMCP_SERVER_PATH(self):
+        return os.getenv("SUPERMCP_SERVER_PATH", "SuperMCP/SuperMCP.py")
+
+    @cached_property
+    def SUPERMCP_TIMEOUT(self):
+        return int(os.getenv("SUPERMCP_TIMEOUT", "60"))  # seconds
     
     # os.environ["OLLAMA_NO_GPU"] = "1"
     # os.environ["OLLAMA_NUM_THREADS"] = str(multiprocessing.cpu_count())
@@ -114,3 +209,4 @@ Additional rules:
 - Always reload_servers() first to ensure you have the latest available tools.
 """
 
+Config = _Config()
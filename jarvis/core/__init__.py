@@ -10,12 +10,13 @@ from .system_info import SystemInfo
 from .command_parser import SuperMCPCommandParser
 from .voice_manager import VoiceManager
 from .output_manager import OutputManager
-from .component_factory import ComponentFactory
+from .component_factory import ComponentFactory, Components
 
 __all__ = [
     'SystemInfo',
     'SuperMCPCommandParser', 
     'VoiceManager',
     'OutputManager',
-    'ComponentFactory'
+    'ComponentFactory',
+    'Components'
 ]
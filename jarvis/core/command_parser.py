@@ -1,80 +1,268 @@
-from typing import Dict, Any, List
-from .supermcp_client import SuperMCPWrapper
+import ast
+import re
+import warnings
+from typing import Dict, Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..supermcp_client import SuperMCPWrapper
+
+
+# "name(args)": the name runs to the first '(' and args to the final ')'
+_COMMAND_RE = re.compile(r"([^(]*)\((.*)\)", re.DOTALL)
+_ARGUMENT_DELIMITERS = re.compile(r"[{},]")
+# One command of a ';'-separated sequence; a ';' inside a quoted string
+# doesn't end it (an unmatched quote is taken as a plain character)
+_SEQUENCE_COMMAND = re.compile(r"""(?:"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^;])+""")
+# Arguments above this size (e.g. inline file contents) are scanned by the JIT
+_JIT_SCAN_MIN_LENGTH = 4096
+# Read-only commands, which may run concurrently with each other. Tool calls
+# run one at a time in the written order, since a step like write_file often
+# depends on the one before it (mkdir)
+_CONCURRENT_COMMANDS = frozenset({"list_servers", "inspect_server"})
+
+
+def _scan_top_commas(buf, positions):
+    """Write the offsets of commas in buf outside any braces to positions; return their count."""
+    count = 0
+    depth = 0
+    for i in range(buf.shape[0]):
+        byte = buf[i]
+        if byte == 123:  # '{'
+            depth += 1
+        elif byte == 125:  # '}'
+            depth -= 1
+        elif byte == 44 and depth == 0:  # ','
+            positions[count] = i
+            count += 1
+    return count
+
+
+_compiled_scan = None
+
+# JSON spellings of constants, which the LLM writes as often as Python's
+_NAME_LITERALS = {"true": True, "false": False, "null": None}
+
+
+def _literal(node: ast.AST) -> Any:
+    """
+    Value of a parsed command argument
+    
+    Like ast.literal_eval, except bare names (server, tool and argument key
+    names such as {path: '/repo'}) evaluate to their own text. The JSON
+    constants true, false and null evaluate to True, False and None.
+    """
+    if isinstance(node, ast.Name):
+        return _NAME_LITERALS.get(node.id, node.id)
+    if isinstance(node, ast.Dict):
+        if None in node.keys:  # {**spread}
+            raise ValueError("unsupported argument")
+        return {_literal(key): _literal(value) for key, value in zip(node.keys, node.values)}
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_literal(element) for element in node.elts]
+    return ast.literal_eval(node)
+
+
+def _get_compiled_scan():
+    """Compile _scan_top_commas on first use; None if numba is not installed."""
+    global _compiled_scan
+    if _compiled_scan is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _compiled_scan = False
+        else:
+            _compiled_scan = njit(cache=True)(_scan_top_commas)
+    return _compiled_scan or None
 
 
 class SuperMCPCommandParser:
-    def __init__(self, supermcp_client: SuperMCPWrapper):
+    def __init__(self, supermcp_client: "SuperMCPWrapper"):
         self.supermcp = supermcp_client
     
     def execute_command_sequence(self, command_sequence: str) -> Dict[str, Any]:
         try:
-            commands = [cmd.strip() for cmd in command_sequence.split(';') if cmd.strip()]
+            commands = [cmd.strip() for cmd in _SEQUENCE_COMMAND.findall(command_sequence) if cmd.strip()]
             results = []
+            batch = []
             
+            # Consecutive read-only commands share one concurrent round; any
+            # other command (reload_servers(), tool calls) is a barrier that
+            # runs alone after everything before it
             for command in commands:
-                print(f"Executing SuperMCP command: {command}")
-                result = self._parse_and_execute_command(command)
-                results.append(result)
+                if command.partition('(')[0].strip() in _CONCURRENT_COMMANDS:
+                    batch.append(command)
+                else:
+                    results.extend(self._execute_batch(batch))
+                    batch = []
+                    results.extend(self._execute_batch([command]))
+            results.extend(self._execute_batch(batch))
             
             return {"success": True, "results": results}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def _parse_and_execute_command(self, command: str) -> Dict[str, Any]:
-        try:
-            if command == "reload_servers()":
-                return self.supermcp.reload_servers()
-            elif command == "list_servers()":
-                return self.supermcp.list_servers()
-            elif command.startswith("inspect_server("):
-                return self._handle_inspect_server(command)
-            elif command.startswith("call_server_tool("):
-                return self._handle_call_server_tool(command)
+    def _execute_batch(self, commands: List[str]) -> List[Dict[str, Any]]:
+        """Run independent commands in one concurrent SuperMCP round, keeping their order."""
+        results: List[Any] = []
+        pending = []  # (index in results, client operation)
+        for command in commands:
+            print(f"Executing SuperMCP command: {command}")
+            parsed = self._parse_command(command)
+            if isinstance(parsed, dict):
+                results.append(parsed)  # parse error
             else:
+                pending.append((len(results), parsed))
+                results.append(None)
+        
+        if pending:
+            try:
+                outputs = self.supermcp.batch_call([operation for _, operation in pending])
+            except Exception as e:
+                outputs = [{"error": f"Command execution failed: {e}"}] * len(pending)
+            for (index, _), output in zip(pending, outputs):
+                if isinstance(output, Exception):
+                    output = {"error": f"Command execution failed: {output}"}
+                results[index] = output
+        return results
+    
+    def _parse_command(self, command: str):
+        """
+        Turn one command into a SuperMCP client operation
+        
+        Returns:
+            A callable taking the SuperMCP client and returning the coroutine
+            to await, or an error dict if the command can't be parsed
+        """
+        operation = self._EXACT_COMMANDS.get(command)
+        if operation is not None:
+            return operation
+        try:
+            # Split "name(args)" with one precompiled match and dispatch on the name
+            match = _COMMAND_RE.fullmatch(command)
+            # "list_servers ()": the name ends before any space
+            handler = match and self._COMMAND_HANDLERS.get(match.group(1).strip())
+            if handler is None:
                 return {"error": f"Unknown command: {command}"}
+            return handler(self, self._parse_call(command, match.group(2)), match.group(2))
         except Exception as e:
             return {"error": f"Command execution failed: {e}"}
     
-    def _handle_inspect_server(self, command: str) -> Dict[str, Any]:
-        # Extract server name from inspect_server(server_name)
-        server_name = command[16:-1]  # Remove "inspect_server(" and ")"
-        return self.supermcp.inspect_server(server_name)
+    def _parse_call(self, command: str, content: str) -> List[Any]:
+        """
+        Argument values of a "name(args)" command
+        
+        The call is parsed by Python's own parser, which handles nested
+        braces and quoted commas. A quoted Windows path with unescaped
+        backslashes is retried with the backslashes taken literally.
+        Commands that still aren't valid Python (e.g. an unquoted path)
+        fall back to splitting content on top-level commas, which yields
+        the arguments as strings.
+        
+        Raises:
+            ValueError: If the command parses but isn't a single call of a
+                        bare name with literal arguments, e.g. a(b)(c)
+        """
+        for source in (command, command.replace("\\", "\\\\")):
+            try:
+                with warnings.catch_warnings():
+                    # e.g. "C:\data": an invalid escape is kept as typed
+                    warnings.simplefilter("ignore")
+                    call = ast.parse(source, mode="eval").body
+            except SyntaxError:
+                continue
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+                    and not call.keywords):
+                raise ValueError(f"Invalid command: {command}")
+            try:
+                return [_literal(arg) for arg in call.args]
+            except (ValueError, TypeError):
+                raise ValueError(f"Arguments must be literals: {command}") from None
+        return self._parse_command_arguments(content)
     
-    def _handle_call_server_tool(self, command: str) -> Dict[str, Any]:
-        try:
-            # Extract the content between parentheses
-            content = command[17:-1]  # Remove "call_server_tool(" and ")"
-            
-            # Parse arguments using simple state machine
-            parts = self._parse_command_arguments(content)
-            
-            if len(parts) >= 3:
-                server_name = parts[0]
-                tool_name = parts[1]
-                # For now, pass empty arguments - we can enhance this later
-                return self.supermcp.call_server_tool(server_name, tool_name, {})
-            else:
-                return {"error": f"Invalid call_server_tool format: {command}"}
-        except Exception as e:
-            return {"error": f"Failed to parse call_server_tool: {e}"}
+    def _handle_reload_servers(self, args: List[Any], content: str):
+        return lambda client: client.reload_servers()
+    
+    def _handle_list_servers(self, args: List[Any], content: str):
+        return lambda client: client.list_servers()
+    
+    def _handle_inspect_server(self, args: List[Any], content: str):
+        # args is the server name from inspect_server(server_name)
+        if not args:
+            return {"error": f"Invalid inspect_server format: inspect_server({content})"}
+        server_name = str(args[0])
+        return lambda client: client.inspect_server(server_name)
+    
+    def _handle_call_server_tool(self, args: List[Any], content: str):
+        if len(args) == 3:
+            server_name = str(args[0])
+            tool_name = str(args[1])
+            # Arguments that didn't parse to a mapping are sent as empty
+            arguments = args[2] if isinstance(args[2], dict) else {}
+            return lambda client: client.call_server_tool(server_name, tool_name, arguments)
+        else:
+            return {"error": f"Invalid call_server_tool format: call_server_tool({content})"}
+    
+    _COMMAND_HANDLERS = {
+        "reload_servers": _handle_reload_servers,
+        "list_servers": _handle_list_servers,
+        "inspect_server": _handle_inspect_server,
+        "call_server_tool": _handle_call_server_tool,
+    }
+    
+    # Commands without arguments are found with one dict lookup, skipping
+    # the regex and the argument parser
+    _EXACT_COMMANDS = {
+        "reload_servers()": lambda client: client.reload_servers(),
+        "list_servers()": lambda client: client.list_servers(),
+    }
     
     def _parse_command_arguments(self, content: str) -> List[str]:
+        # Fast path: without braces every comma is a separator
+        if '{' not in content and '}' not in content:
+            parts = content.split(',')
+            if not parts[-1]:
+                parts.pop()
+            return [part.strip() for part in parts]
+        
+        if len(content) >= _JIT_SCAN_MIN_LENGTH:
+            scan = _get_compiled_scan()
+            if scan is not None:
+                return self._parse_large_command_arguments(content, scan)
+        
+        # Only visit brace/comma positions instead of every character
         parts = []
-        current_part = ""
+        start = 0
         brace_count = 0
         
-        for char in content:
+        for match in _ARGUMENT_DELIMITERS.finditer(content):
+            char = match.group()
             if char == '{':
                 brace_count += 1
             elif char == '}':
                 brace_count -= 1
-            elif char == ',' and brace_count == 0:
-                parts.append(current_part.strip())
-                current_part = ""
-                continue
-            current_part += char
+            elif brace_count == 0:
+                parts.append(content[start:match.start()].strip())
+                start = match.end()
+        
+        if start < len(content):
+            parts.append(content[start:].strip())
+        
+        return parts
+    
+    def _parse_large_command_arguments(self, content: str, scan) -> List[str]:
+        import numpy as np
+        
+        # Delimiters are ASCII, so byte offsets always fall on UTF-8 boundaries
+        data = content.encode()
+        positions = np.empty(len(data), dtype=np.int32)
+        count = scan(np.frombuffer(data, dtype=np.uint8), positions)
+        parts = []
+        start = 0
+        for position in positions[:count].tolist():
+            parts.append(data[start:position].decode().strip())
+            start = position + 1
         
-        if current_part:
-            parts.append(current_part.strip())
+        if start < len(data):
+            parts.append(data[start:].decode().strip())
         
         return parts
@@ -1,17 +1,38 @@
-""from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
 from ..config import Config
-from ..voice_output import TextToSpeech
-from ..llm import LLM
-from ..supermcp_client import SuperMCPWrapper
 from .system_info import SystemInfo
 from .command_parser import SuperMCPCommandParser
 from .output_manager import OutputManager
 from .voice_manager import VoiceManager
 
+# The voice, LLM and MCP modules pull in piper, ollama, mcp and audio
+# libraries, so they are only imported when a component is created
+if TYPE_CHECKING:
+    from ..voice_output import TextToSpeech
+    from ..llm import LLM
+    from ..supermcp_client import SuperMCPWrapper
+
+
+@dataclass(slots=True)
+class Components:
+    """Everything create_all_components() builds"""
+    llm: "LLM"
+    tts: "TextToSpeech"
+    supermcp: "SuperMCPWrapper"
+    command_parser: SuperMCPCommandParser
+    output_manager: OutputManager
+    voice_manager: Optional[VoiceManager] = None
+
 
 class ComponentFactory:
     @staticmethod
-    def create_llm() -> LLM:
+    def create_llm() -> "LLM":
+        from ..llm import LLM
+        
         print("Getting system information...")
         system_info = SystemInfo.get_system_info()
         
@@ -25,33 +46,63 @@ class ComponentFactory:
         )
     
     @staticmethod
-    def create_tts() -> TextToSpeech:
+    def create_tts() -> "TextToSpeech":
+        from ..voice_output import TextToSpeech, default_session_options
+        
         print("Initiating TTS...")
-        return TextToSpeech(
-            model_path=f"models/piper/{Config.TTS_MODEL_ONNX}",
-            config_path=f"models/piper/{Config.TTS_MODEL_JSON}",
-        )
+        model_path = Path("models/piper") / Config.TTS_MODEL_ONNX
+        
+        def load(path):
+            return TextToSpeech(
+                model_path=str(path),
+                config_path=f"models/piper/{Config.TTS_MODEL_JSON}",
+                session_options=default_session_options(threads=Config.TTS_THREADS or None),
+                host_api=Config.AUDIO_HOST_API,
+                wasapi_exclusive=Config.AUDIO_WASAPI_EXCLUSIVE,
+                tensorrt=Config.TTS_TENSORRT,
+            )
+        
+        # Prefer the int8 copy made by scripts/quantize_piper.py
+        quantized = model_path.with_suffix(".int8.onnx")
+        if Config.TTS_QUANTIZED and quantized.is_file():
+            try:
+                tts = load(quantized)
+            except Exception as e:
+                # e.g. a copy made with int8 Conv weights, which ORT can't run
+                print(f"Warning: could not load {quantized.name} ({e}); using {model_path.name}")
+                tts = load(model_path)
+        else:
+            tts = load(model_path)
+        # Warm the ONNX session in the background while the rest starts up
+        threading.Thread(target=tts.warm_up, daemon=True).start()
+        return tts
     
     @staticmethod
-    def create_supermcp() -> SuperMCPWrapper:
+    def create_supermcp() -> "SuperMCPWrapper":
+        from ..supermcp_client import SuperMCPWrapper
+        
         print("Initiating SuperMCP...")
         return SuperMCPWrapper()
     
     @staticmethod
-    def create_command_parser(supermcp: SuperMCPWrapper) -> SuperMCPCommandParser:
+    def create_command_parser(supermcp: "SuperMCPWrapper") -> SuperMCPCommandParser:
         return SuperMCPCommandParser(supermcp)
     
     @staticmethod
-    def create_output_manager(tts: TextToSpeech) -> OutputManager:
+    def create_output_manager(tts: "TextToSpeech") -> OutputManager:
         return OutputManager(tts)
     
     @staticmethod
     def create_voice_manager(on_command) -> Optional[VoiceManager]:
         print("Initiating Voice Activation...")
-        return VoiceManager(on_command)
+        voice_manager = VoiceManager(on_command)
+        # Load the Vosk models now rather than on the first listen; a
+        # failure here is reported again when listening starts
+        voice_manager.preload()
+        return voice_manager
     
     @staticmethod
-    def create_all_components(text_mode: bool = False, on_voice_command=None):
+    def create_all_components(text_mode: bool = False, on_voice_command=None) -> Components:
         """
         Create all JARVIS components
 
@@ -60,28 +111,44 @@ class ComponentFactory:
             on_voice_command: Callback for voice commands
 
         Returns:
-            Dictionary of all initialized components
+            Components holding every initialized component
         """
-        components = {}
-        
-        # Core components (always needed)
-        components['llm'] = ComponentFactory.create_llm()
-        components['tts'] = ComponentFactory.create_tts()
-        components['supermcp'] = ComponentFactory.create_supermcp()
+        # Components (the voice manager only outside text mode). They don't
+        # depend on each other, so loading them together makes startup as
+        # slow as the slowest one (usually the Ollama preload) instead of
+        # the sum
+        with_voice = not text_mode and on_voice_command is not None
+        if Config.PARALLEL_INIT:
+            with ThreadPoolExecutor(max_workers=4 if with_voice else 3) as executor:
+                llm_future = executor.submit(ComponentFactory.create_llm)
+                tts_future = executor.submit(ComponentFactory.create_tts)
+                supermcp_future = executor.submit(ComponentFactory.create_supermcp)
+                voice_future = (
+                    executor.submit(ComponentFactory.create_voice_manager, on_voice_command)
+                    if with_voice else None
+                )
+                llm = llm_future.result()
+                tts = tts_future.result()
+                supermcp = supermcp_future.result()
+                voice_manager = voice_future.result() if voice_future else None
+        else:
+            llm = ComponentFactory.create_llm()
+            tts = ComponentFactory.create_tts()
+            supermcp = ComponentFactory.create_supermcp()
+            voice_manager = (
+                ComponentFactory.create_voice_manager(on_voice_command)
+                if with_voice else None
+            )
         
-        # Dependent components
-        components['command_parser'] = ComponentFactory.create_command_parser(
-            components['supermcp']
+        components = Components(
+            llm=llm,
+            tts=tts,
+            supermcp=supermcp,
+            # Dependent components
+            command_parser=ComponentFactory.create_command_parser(supermcp),
+            output_manager=ComponentFactory.create_output_manager(tts),
+            voice_manager=voice_manager,
         )
-        components['output_manager'] = ComponentFactory.create_output_manager(
-            components['tts']
-        )
-        
-        # Voice components (only if not in text mode)
-        if not text_mode and on_voice_command:
-            components['voice_manager'] = ComponentFactory.create_voice_manager(
-                on_voice_command
-            )
         
         print("Initiations Complete!")
         return components
@@ -1,26 +1,93 @@
-from typing import Dict, Any
+import threading
+from queue import Empty, Queue
+from typing import Callable, Dict, Any, Optional, TYPE_CHECKING
 from ..config import Config
-from ..voice_output import TextToSpeech
+
+if TYPE_CHECKING:
+    from ..voice_output import TextToSpeech
 
 
 class OutputManager:
     """Manages output formatting and delivery"""
 
-    def __init__(self, tts: TextToSpeech):
+    def __init__(self, tts: "TextToSpeech"):
         self.tts = tts
+        self._speech_queue = None
+        self._speech_thread = None
+        self._spoke = False
+        self.refresh_mode()
     
-    def handle_response(self, response: Dict[str, Any]) -> None:
-        if Config.OUTPUT_MODE == "voice":
-            self._output_voice(response["output"])
-        elif Config.OUTPUT_MODE == "text":
-            self._output_text(response["output"])
+    def refresh_mode(self) -> None:
+        """Resolve Config.OUTPUT_MODE to an output method (call again after changing it)"""
+        mode = Config.OUTPUT_MODE
+        self._voice = mode == "voice"
+        if self._voice:
+            self._emit = self._output_voice
         else:
-            # Default to text if unknown mode
-            print(f"Warning: Unknown output mode '{Config.OUTPUT_MODE}', using text")
-            self._output_text(response["output"])
+            if mode != "text":
+                # Default to text if unknown mode
+                print(f"Warning: Unknown output mode '{mode}', using text")
+            self._emit = self._output_text
+    
+    def start_stream(self) -> Optional[Callable[[str], None]]:
+        """
+        Start speaking text while the LLM is still generating it
+        
+        Returns:
+            Callback that queues text for playback, or None if not in voice mode
+        """
+        if not self._voice:
+            return None
+        self._speech_queue = Queue()
+        self._speech_thread = threading.Thread(target=self._speak_queued, daemon=True)
+        self._speech_thread.start()
+        return self._speech_queue.put
+    
+    def discard_stream(self) -> None:
+        """Drop streamed text that hasn't started playing (e.g. a reply the LLM retries)"""
+        if self._speech_queue is None:
+            return
+        try:
+            while True:
+                self._speech_queue.get_nowait()
+        except Empty:
+            pass
+    
+    def finish_stream(self) -> bool:
+        """
+        Wait until queued speech has been played
+        
+        Returns:
+            True if any text was streamed to TTS
+        """
+        if self._speech_thread is None:
+            return False
+        self._speech_queue.put(None)
+        self._speech_thread.join()
+        spoken = self._spoke
+        self._speech_queue = None
+        self._speech_thread = None
+        return spoken
+    
+    def _speak_queued(self) -> None:
+        self._spoke = False
+        # One started output stream for the whole reply; it is stopped (and
+        # drained) once, after the last sentence
+        self.tts.begin()
+        try:
+            for text in iter(self._speech_queue.get, None):
+                self._spoke = True
+                self._output_voice(text)
+        finally:
+            self.tts.end()
+    
+    def handle_response(self, response: Dict[str, Any], spoken: bool = False) -> None:
+        # Streamed replies were already spoken by start_stream()
+        if not spoken:
+            self._emit(response["output"])
     
     def _output_voice(self, text: str) -> None:
-        self.tts.say(text)
+        self.tts.stream_say(text)
     
     def _output_text(self, text: str) -> None:
         print(text)
@@ -29,4 +96,4 @@ class OutputManager:
         return Config.OUTPUT_MODE
     
     def is_voice_mode(self) -> bool:
-        return Config.OUTPUT_MODE == "voice"
+        return self._voice
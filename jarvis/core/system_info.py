@@ -7,7 +7,9 @@ and other system-dependent operations.
 
 import platform
 import shutil
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Tuple
+from ..config import Config
 
 
 class SystemInfo:
@@ -21,6 +23,15 @@ class SystemInfo:
         Returns:
             Dictionary containing system information
         """
+        # Copy so callers can't modify the cached result
+        info = dict(SystemInfo._detect())
+        info['shell'] = list(info['shell'])
+        return info
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _detect() -> Dict[str, str]:
+        """Probe the platform once; OS and shells don't change at runtime."""
         system = platform.system().lower()
         
         return {
@@ -32,7 +43,14 @@ class SystemInfo:
         }
     
     @staticmethod
-    def _get_shell_command(system: str) -> List[str]:
+    def clear_cache() -> None:
+        """Forget the cached system information (e.g. between tests)."""
+        SystemInfo._detect.cache_clear()
+        SystemInfo._get_shell_command.cache_clear()
+    
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _get_shell_command(system: str) -> Tuple[str, ...]:
         """
         Get the appropriate shell command for the current system
         
@@ -40,20 +58,23 @@ class SystemInfo:
             system: Platform system name (lowercase)
             
         Returns:
-            List of shell command arguments
+            Tuple of shell command arguments (cached, so immutable)
         """
+        if Config.SHELL_CMD:
+            return Config.SHELL_CMD
+        
         if system == "windows":
             if shutil.which("pwsh"):
-                return ["pwsh", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command"]
+                return ("pwsh", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command")
             elif shutil.which("powershell"):
-                return ["powershell.exe", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command"]
+                return ("powershell.exe", "-NoLogo", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command")
             else:
-                return ["cmd.exe", "/d", "/s", "/c"]
+                return ("cmd.exe", "/d", "/s", "/c")
         else:
             if shutil.which("bash"):
-                return ["bash", "-lc"]
+                return ("bash", "-lc")
             else:
-                return ["sh", "-lc"]
+                return ("sh", "-lc")
     
     @staticmethod
     def get_platform_summary() -> str:
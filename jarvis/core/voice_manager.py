@@ -5,12 +5,28 @@ This module handles voice activation coordination, wake word detection,
 and voice command processing.
 """
 
+import logging
+import threading
 import time
+from queue import Empty, Queue
 from typing import Callable, Optional
-from ..voice_input import SpeechToText
-from ..voice_activation import VoiceActivation
 from ..config import Config
 
+# Status messages go through logging so they cost nothing unless enabled
+# (JARVIS_LOG=INFO); prompts meant for the user stay as prints
+log = logging.getLogger("jarvis.voice")
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 4000
+# Seconds without speech after a wake word before going back to listening
+# for the wake word (e.g. after a false wake)
+COMMAND_TIMEOUT = 8.0
+
+# Where VoiceManager routes microphone audio in voice activation mode
+_WAKE = "wake"        # wake word detector
+_COMMAND = "command"  # speech-to-text for the spoken command
+_IDLE = "idle"        # nowhere (e.g. while JARVIS speaks its answer)
+
 
 class VoiceManager:
     """Manages voice activation and command processing"""
@@ -22,14 +38,28 @@ class VoiceManager:
         Args:
             on_command: Callback function called when a voice command is received
         """
+        # Imported here so text mode never loads vosk and the audio libraries
+        from ..voice_input import Microphone, SpeechToText
+        from ..voice_activation import VoiceActivation
+        
         self.on_command = on_command
-        self._wake_word_detected = False
+        # The callback runs on the listening thread; the main loop blocks on these
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        
+        # One microphone stream shared by wake word detection and STT
+        self._microphone = Microphone(sample_rate=SAMPLE_RATE, chunk_size=CHUNK_SIZE,
+                                      host_api=Config.AUDIO_HOST_API,
+                                      wasapi_exclusive=Config.AUDIO_WASAPI_EXCLUSIVE)
+        self._audio_thread = None
+        self._route = _IDLE
+        self._cleaned = False
         
         # Initialize voice components
         self.stt = SpeechToText(
             model_path=Config.VOSK_MODEL_PATH,
-            sample_rate=16000,
-            chunk_size=4000,
+            sample_rate=SAMPLE_RATE,
+            chunk_size=CHUNK_SIZE,
             phrase_timeout=3.0,
             silence_timeout=1.0,
             device_index=None
@@ -38,12 +68,29 @@ class VoiceManager:
         self.voice_activation = VoiceActivation(
             wake_words=Config.WAKE_WORDS,
             model_path=Config.VOSK_MODEL_PATH,
-            sample_rate=16000,
-            chunk_size=4000,
+            sample_rate=SAMPLE_RATE,
+            chunk_size=CHUNK_SIZE,
             sensitivity=Config.VOICE_ACTIVATION_SENSITIVITY,
-            on_wake_word=self._on_wake_word_detected
+            on_wake_word=self._on_wake_word_detected,
+            silence_threshold=Config.VOICE_ACTIVATION_SILENCE_THRESHOLD,
+            use_grammar=Config.VOICE_ACTIVATION_GRAMMAR
         )
     
+    def preload(self) -> bool:
+        """
+        Load the wake word and STT models ahead of the first listen
+        
+        Returns:
+            True if both models loaded, False otherwise
+        """
+        try:
+            self.stt.load()
+        except Exception as e:
+            log.error("Failed to load speech-to-text model: %s", e)
+            return False
+        # Both recognizers use the same model, so it is only loaded once
+        return self.voice_activation.initialize(model=self.stt.model)
+    
     def start_voice_activation_mode(self) -> bool:
         """
         Start voice activation mode (wake word detection)
@@ -57,76 +104,191 @@ class VoiceManager:
             print("Press Ctrl+C to stop.\n")
             
             # Start voice activation
-            if not self.voice_activation.start_listening():
-                print("Failed to start voice activation")
+            self._stop_event.clear()
+            if not self._start_audio():
+                log.error("Failed to start voice activation")
                 return False
             
-            # Main loop - check for wake word detection
-            while True:
-                if self._wake_word_detected:
-                    self._wake_word_detected = False  # Reset flag
-                    self._process_voice_command()
-                time.sleep(0.5)  # Small delay to avoid busy waiting
+            # Main loop - sleep until a wake word (or stop()) sets the event.
+            # The timeout only lets Ctrl+C through: an untimed wait can't be
+            # interrupted on Windows
+            while not self._stop_event.is_set():
+                if not self._wake_event.wait(timeout=0.5):
+                    continue
+                if self._stop_event.is_set():
+                    break
+                self._wake_event.clear()
+                self._process_voice_command()
+            return True
                     
         except KeyboardInterrupt:
             print("\nShutting down...")
             return True
         finally:
+            self._stop_audio()
             self.voice_activation.cleanup()
     
+    def _start_audio(self) -> bool:
+        """
+        Load both recognizers and open the shared microphone stream
+        
+        Wake word detection and command transcription read the same stream,
+        so switching between them is a routing change instead of closing and
+        reopening the audio device and reloading Vosk on every wake word.
+        
+        Returns:
+            True if started successfully, False otherwise
+        """
+        if not self.preload():
+            return False
+        try:
+            self._microphone.start()
+        except Exception as e:
+            log.error("Failed to open audio stream: %s", e)
+            self._stop_audio()
+            return False
+        
+        self._route = _WAKE
+        self._audio_thread = threading.Thread(
+            target=self._route_audio, name="jarvis-audio", daemon=True
+        )
+        self._audio_thread.start()
+        log.info("Voice activation listening started")
+        return True
+    
+    def _route_audio(self) -> None:
+        """Audio thread: hand each chunk to whichever recognizer is active"""
+        try:
+            # Chunks arrive from the microphone callback; None means it closed
+            for data in iter(self._microphone.read, None):
+                if self._stop_event.is_set():
+                    break
+                route = self._route
+                if route == _WAKE:
+                    self.voice_activation.process_audio(data)
+                elif route == _COMMAND:
+                    self.stt.process_audio(data)
+        except Exception as e:
+            if not self._stop_event.is_set():
+                log.error("Error in audio loop: %s", e)
+        finally:
+            # No more audio: release a pending STT read and the main loop
+            self.stt.end_results()
+            self.stop()
+    
+    def _stop_audio(self) -> None:
+        """Stop the audio thread and close the shared stream"""
+        self._route = _IDLE
+        self._stop_event.set()
+        
+        # Closing the microphone ends the audio thread's blocking read
+        self._microphone.close()
+        
+        if self._audio_thread:
+            self._audio_thread.join(timeout=2.0)
+            self._audio_thread = None
+    
     def start_continuous_listening_mode(self) -> None:
         """
         Start continuous listening mode (legacy mode)
         """
+        # Commands are answered on a worker thread so transcription keeps
+        # up while the LLM and TTS run; at most two wait their turn
+        commands = Queue(maxsize=2)
+        worker = threading.Thread(
+            target=self._run_commands, args=(commands,), name="jarvis-commands", daemon=True
+        )
         try:
             self.stt.start()
+            worker.start()
             print("I am listening.")
             print("Listening... Ctrl+C to stop.\n")
             
             for text, is_final in self.stt.iter_results():
                 if is_final:
-                    print(text)
-                    self.on_command(text)
+                    log.debug("Command: %s", text)
+                    commands.put(text)
                     
         except KeyboardInterrupt:
-            pass
+            # Drop commands that were not started yet
+            while True:
+                try:
+                    commands.get_nowait()
+                except Empty:
+                    break
         finally:
             self.stt.stop()
+            commands.put(None)  # worker exits after the queued commands
+    
+    def _run_commands(self, commands: Queue) -> None:
+        """Worker thread for continuous listening mode"""
+        for text in iter(commands.get, None):
+            try:
+                self.on_command(text)
+            except Exception as e:
+                log.error("Error processing voice command: %s", e)
     
     def _on_wake_word_detected(self) -> None:
         """Callback when wake word is detected"""
-        print("Wake word detected! Setting flag...")
-        self._wake_word_detected = True
+        log.info("Wake word detected! Waking main loop...")
+        self._wake_event.set()
+    
+    def stop(self) -> None:
+        """Make start_voice_activation_mode return, e.g. from another thread"""
+        self._stop_event.set()
+        self._wake_event.set()
     
     def _process_voice_command(self) -> None:
         """Process voice command after wake word detection"""
-        print("Starting voice processing...")
+        log.info("Starting voice processing...")
         
-        # Stop voice activation to free up audio resources
-        self.voice_activation.stop_listening()
-        
-        # Start STT processing
-        self.stt.start()
+        # Route the shared stream to STT, starting from a clean utterance
+        self.stt.reset()
+        self._route = _COMMAND
         try:
             print("Listening for your command...")
-            for text, is_final in self.stt.iter_results():
+            deadline = time.monotonic() + COMMAND_TIMEOUT
+            # Short reads so Ctrl+C and stop() get through; the audio thread
+            # sets the stop event when the stream ends
+            while not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print("No command heard.")
+                    break
+                item = self.stt.read(timeout=min(0.5, remaining))
+                if item is None:
+                    continue
+                text, is_final = item
+                if text.strip():
+                    # Still speaking: give the command time to finish
+                    deadline = time.monotonic() + COMMAND_TIMEOUT
                 if is_final and text.strip():
-                    print(f"Final Input: {text}")
+                    # Don't transcribe or wake on our own spoken answer
+                    self._route = _IDLE
+                    log.info("Final Input: %s", text)
                     self.on_command(text)
                     break  # Exit after processing one command
         except Exception as e:
-            print(f"Error processing voice command: {e}")
+            log.error("Error processing voice command: %s", e)
         finally:
-            self.stt.stop()
-            print("Voice processing completed. Restarting wake word detection...")
-            
-            # Restart voice activation
-            if not self.voice_activation.start_listening():
-                print("Failed to restart voice activation")
+            self._route = _IDLE
+            self.voice_activation.reset()
+            log.info("Voice processing completed. Listening for the wake word again...")
+            self._route = _WAKE
     
     def cleanup(self) -> None:
-        """Clean up voice resources"""
-        if hasattr(self, 'voice_activation'):
-            self.voice_activation.cleanup()
-        if hasattr(self, 'stt'):
-            self.stt.stop()
+        """Clean up voice resources (only the first call does anything)"""
+        if self._cleaned:
+            return
+        self._cleaned = True
+        self._stop_audio()
+        self.voice_activation.cleanup()
+        self.stt.stop()
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit: release the microphone and Vosk models"""
+        self.cleanup()
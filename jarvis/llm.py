@@ -1,44 +1,200 @@
 import ollama
 from .config import Config
 import json
+import re
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# A streamed reply can be spoken before it is complete once it is known to
+# be a Conversation; the "output" string starts right after this prefix
+_CONVERSATION_OUTPUT = re.compile(r'"user_request"\s*:\s*"Conversation"\s*,\s*"output"\s*:\s*"')
+# Raw JSON string content up to (but excluding) the closing quote
+_JSON_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*')
+_SENTENCE_END = re.compile(r'[.!?]\s')
+
+
+def _to_json(obj):
+    """Serialize a prompt payload, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass  # e.g. non-str keys; the stdlib encoder reports those properly
+    return json.dumps(obj)
+
+
+@lru_cache(maxsize=4)
+def _render_rule(system, release, version, machine, shell):
+    """System prompt for a platform; shell must be hashable (a tuple)."""
+    return Config.LLM_RULE.format(system=system, release=release, version=version, machine=machine, shell=shell)
+
+
+@lru_cache(maxsize=None)
+def _preload(model, system_prompt):
+    """Load the model (and its system prompt) once per process."""
+    ollama.chat(
+        model=model,
+        messages=[{'role': 'system', 'content': system_prompt}],
+        keep_alive=Config.LLM_KEEP_ALIVE
+    )
+
+
+class _OutputStreamer:
+    """Feeds complete sentences of a streamed Conversation "output" to a callback."""
+
+    def __init__(self, on_partial):
+        self.on_partial = on_partial
+        self.start = None  # offset of the next unsent output character
+        self.done = False
+        self.emitted = False  # some text was sent
+        self.failed = False  # a sentence didn't decode; streaming stopped
+
+    def feed(self, buffer):
+        if self.done:
+            return
+        if self.start is None:
+            match = _CONVERSATION_OUTPUT.search(buffer)
+            if not match:
+                return
+            self.start = match.end()
+
+        body_end = _JSON_STRING_BODY.match(buffer, self.start).end()
+        if buffer.startswith('"', body_end):
+            # Closing quote seen: send the rest of the output
+            self._emit(buffer[self.start:body_end])
+            self.done = True
+            return
+
+        last_end = None
+        for last_end in _SENTENCE_END.finditer(buffer, self.start, body_end):
+            pass
+        if last_end is not None:
+            self._emit(buffer[self.start:last_end.end()])
+            self.start = last_end.end()
+
+    def _emit(self, raw):
+        try:
+            text = json.loads(f'"{raw}"').strip()
+        except json.decoder.JSONDecodeError:
+            # Send nothing more; ask() has the whole output spoken instead
+            self.failed = True
+            self.done = True
+            return
+        if text:
+            self.emitted = True
+            self.on_partial(text)
 
 class LLM:
+    # Attempts at getting valid JSON before ask() gives up
+    MAX_JSON_ATTEMPTS = 3
+
     def __init__(self, system, release, version, machine, shell):
         self.llm_model = Config.LLM_MODEL
         self.default_chat = [
                     {
                         'role': 'system',
-                        'content': Config.LLM_RULE.format(system=system, release=release, version=version, machine=machine, shell=shell),
+                        'content': _render_rule(system, release, version, machine, tuple(shell)),
                     }
                 ]
-        self.chat_history = list.copy(self.default_chat)
+        # History lists share the system message dict; it is never mutated
+        self.chat_history = self.default_chat[:]
+        # Whether the last reply's whole output went out through on_partial
+        self.output_streamed = False
 
         print("LLM: Initiating Preload...")
-        # Start preload
-        ollama.chat(
-            model=Config.LLM_MODEL,
-            messages=self.chat_history
-        )
+        # Start preload (skipped if another LLM already loaded this setup)
+        _preload(self.llm_model, self.default_chat[0]['content'])
         print("LLM: Initiation Complete!")
     
-    def ask(self, prompt):
+    def ask(self, prompt, on_partial=None, on_discard=None):
+        """
+        Send a prompt and return the parsed JSON reply
+
+        output_streamed tells afterwards whether on_partial received the
+        reply's whole output; if not, the caller should present the output
+        itself.
+
+        Args:
+            prompt: User input text, or a JSON-serializable object (e.g.
+                    SuperMCP results) that is serialized once here
+            on_partial: Optional callback receiving the "output" text of a
+                        Conversation reply sentence by sentence while it streams
+            on_discard: Optional callback telling the on_partial consumer to
+                        drop text it hasn't presented yet, called when a
+                        reply it was sent is retried or can't be streamed
+
+        Returns:
+            Parsed response dictionary
+
+        Raises:
+            RuntimeError: If the model keeps replying with invalid JSON
+        """
+        if not isinstance(prompt, str):
+            prompt = _to_json(prompt)
+        self.output_streamed = False
+        # Trim between turns only, so retries and tool round trips never
+        # lose the message they answer
+        self._trim_history()
         self.chat_history.append({
             'role': 'user',
             'content': prompt
         })
 
-        response = ollama.chat(
-            model=self.llm_model,
-            messages=self.chat_history
-        )["message"]["content"]
+        for _ in range(self.MAX_JSON_ATTEMPTS):
+            streamer = _OutputStreamer(on_partial) if on_partial else None
+            response = self._chat(streamer)
+            print(f"LLM Responded:'\n{response}\n----------")
+            self.chat_history.append({'role': 'assistant', 'content': response})
 
-        print(f"LLM Responded:'\n{response}\n----------")
+            try:
+                parsed = json.loads(response)
+            except json.decoder.JSONDecodeError:
+                # Don't let the retried reply be spoken on top of this one
+                if streamer and streamer.emitted and on_discard:
+                    on_discard()
+                # The broken reply stays in the history next to the correction
+                self.chat_history.append({
+                    'role': 'user',
+                    'content': Config.LLM_WRONG_JSON_FORMAT_MESSAGE
+                })
+                continue
 
-        try:
-            return json.loads(response)
-        
-        except json.decoder.JSONDecodeError:
-            return self.ask(Config.LLM_WRONG_JSON_FORMAT_MESSAGE)
+            if streamer and streamer.failed and streamer.emitted and on_discard:
+                on_discard()
+            self.output_streamed = bool(streamer and streamer.done and not streamer.failed)
+            return parsed
+
+        raise RuntimeError(f"LLM did not return valid JSON after {self.MAX_JSON_ATTEMPTS} attempts")
+
+    def _chat(self, streamer=None):
+        """Stream one reply for the current history, constrained to JSON output."""
+        response = ""
+        for chunk in ollama.chat(
+            model=self.llm_model,
+            messages=self.chat_history,
+            format="json",
+            # Ollama reuses the KV cache for the unchanged history prefix
+            # (system prompt, earlier turns, tool round trips) only while
+            # the model stays loaded
+            keep_alive=Config.LLM_KEEP_ALIVE,
+            stream=True
+        ):
+            response += chunk["message"]["content"]
+            if streamer:
+                streamer.feed(response)
+        return response
         
+    def _trim_history(self):
+        """Keep the system prompt and the last LLM_HISTORY_TURNS exchanges."""
+        keep = 2 * Config.LLM_HISTORY_TURNS
+        base = len(self.default_chat)
+        if len(self.chat_history) > base + keep:
+            tail = self.chat_history[base:]
+            self.chat_history = self.default_chat + (tail[-keep:] if keep > 0 else [])
+
     def reset_history(self):
-        self.chat_history = list.copy(self.default_chat)
+        self.chat_history = self.default_chat[:]
@@ -1,6 +1,5 @@
 from .config import Config
 from .core import ComponentFactory
-from json import dumps
 
 class Jarvis:
     def __init__(self, text_mode=False):
@@ -20,12 +19,12 @@ class Jarvis:
         )
         
         # Extract components for easy access
-        self.llm = self.components['llm']
-        self.command_parser = self.components['command_parser']
-        self.output_manager = self.components['output_manager']
+        self.llm = self.components.llm
+        self.command_parser = self.components.command_parser
+        self.output_manager = self.components.output_manager
         
         # Voice manager only exists in voice mode
-        self.voice_manager = self.components.get('voice_manager')
+        self.voice_manager = self.components.voice_manager
 
     def _handle_voice_command(self, text: str) -> None:
         """
@@ -47,23 +46,43 @@ class Jarvis:
         Returns:
             LLM response dictionary
         """
-        response = self.llm.ask(prompt)
-        while response['user_request'] != "Conversation":
-            if response['user_request'] == "SuperMCP":
-                # Handle SuperMCP commands
-                supermcp_output = self.command_parser.execute_command_sequence(response['output'])
-                print(f"Output from SuperMCP:\n{supermcp_output}\n----------")
-                response = self.llm.ask(dumps(supermcp_output))
+        # In voice mode, Conversation replies are spoken while they stream in
+        on_partial = self.output_manager.start_stream()
+        on_discard = self.output_manager.discard_stream
+        try:
+            response = self.llm.ask(prompt, on_partial, on_discard)
+            while response['user_request'] != "Conversation":
+                if response['user_request'] == "SuperMCP":
+                    # Handle SuperMCP commands
+                    supermcp_output = self.command_parser.execute_command_sequence(response['output'])
+                    print(f"Output from SuperMCP:\n{supermcp_output}\n----------")
+                    response = self.llm.ask(supermcp_output, on_partial, on_discard)
+        finally:
+            spoken = self.output_manager.finish_stream()
+        # Say the whole output if part of it couldn't be streamed
+        spoken = spoken and self.llm.output_streamed
 
         # Reset history only if configured to do so
         if Config.RESET_HISTORY_AFTER_RESPONSE:
             self.llm.reset_history()
         
         # Handle output using output manager
-        self.output_manager.handle_response(response)
+        self.output_manager.handle_response(response, spoken=spoken)
         
         return response
 
+    def cleanup(self):
+        """Release voice resources (microphone, Vosk models, audio output)."""
+        if self.voice_manager:
+            self.voice_manager.cleanup()
+        self.components.tts.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+
     def listen_with_activation(self):
         """Listen with voice activation (wake word detection)."""
         if not self.voice_manager:
@@ -1,7 +1,10 @@
 import asyncio
+import atexit
+import concurrent.futures
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from .config import Config
@@ -107,29 +110,132 @@ class SuperMCPClient:
 
 # Synchronous wrapper for easier integration with existing JARVIS code
 class SuperMCPWrapper:
+    # One SuperMCP server process and session for the wrapper's lifetime,
+    # driven by an event loop on a background thread. MCP matches replies to
+    # requests by id, so calls from several threads can share the session.
+    
     def __init__(self):
-        self.client = SuperMCPClient()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._lock = threading.Lock()
+        self._session_task = None
+        self._ready = None
+        self._closing = None
+        # Connect in the background; the first call waits for it
+        self._connect()
+        atexit.register(self.close)
         
     def reload_servers(self) -> Dict[str, Any]:
         """Synchronous wrapper for reload_servers"""
-        return asyncio.run(self._run_async(self.client.reload_servers()))
+        return self._run(lambda client: client.reload_servers())
         
     def list_servers(self) -> List[Dict[str, Any]]:
         """Synchronous wrapper for list_servers"""
-        return asyncio.run(self._run_async(self.client.list_servers()))
+        return self._run(lambda client: client.list_servers())
         
     def inspect_server(self, server_name: str) -> Dict[str, Any]:
         """Synchronous wrapper for inspect_server"""
-        return asyncio.run(self._run_async(self.client.inspect_server(server_name)))
+        return self._run(lambda client: client.inspect_server(server_name))
         
     def call_server_tool(self, server_name: str, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
         """Synchronous wrapper for call_server_tool"""
-        return asyncio.run(self._run_async(self.client.call_server_tool(server_name, tool_name, arguments)))
+        return self._run(
+            lambda client: client.call_server_tool(server_name, tool_name, arguments)
+        )
         
-    async def _run_async(self, coro):
-        """Helper to run async operations"""
-        async with self.client:
+    def batch_call(self, operations: List[Callable[[SuperMCPClient], Awaitable[Any]]]) -> List[Any]:
+        """
+        Run several client operations concurrently in a single hand-off to
+        the event loop
+        
+        Args:
+            operations: Callables taking the client and returning the coroutine
+                        to await, e.g. lambda client: client.list_servers()
+        
+        Returns:
+            Results in the same order as operations; an operation that raised
+            yields its exception instead of failing the whole batch. If
+            SuperMCP can't be reached, every result is that error dict
+        """
+        try:
+            client = self._client()
+        except Exception as e:
+            return [self._connection_error(e)] * len(operations)
+        return asyncio.run_coroutine_threadsafe(
+            self._gather(client, operations), self._loop
+        ).result()
+        
+    async def _gather(self, client, operations):
+        return await asyncio.gather(
+            *(self._run_async(client, operation) for operation in operations),
+            return_exceptions=True
+        )
+        
+    def close(self) -> None:
+        """Disconnect from SuperMCP and stop the event loop thread"""
+        if self._loop.is_closed():
+            return
+        if self._session_task and not self._session_task.done():
+            self._loop.call_soon_threadsafe(self._closing.set)
             try:
-                return await asyncio.wait_for(coro, timeout=self.client.timeout)
-            except asyncio.TimeoutError:
-                return {"error": f"SuperMCP operation timed out after {self.client.timeout} seconds"}
+                self._session_task.result(timeout=5)
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        # A loop stuck in a slow disconnect can't be closed while it runs;
+        # it is a daemon thread, so it ends with the process
+        if not self._thread.is_alive():
+            self._loop.close()
+        
+    def _connect(self) -> None:
+        """Start the task that owns the client connection"""
+        self._ready = concurrent.futures.Future()
+        self._closing = asyncio.Event()
+        self._session_task = asyncio.run_coroutine_threadsafe(
+            self._hold_session(self._ready, self._closing), self._loop
+        )
+        
+    async def _hold_session(self, ready, closing):
+        """Keep one client connected until close(); connect and disconnect
+        must happen in the same task for the stdio transport"""
+        try:
+            async with SuperMCPClient() as client:
+                ready.set_result(client)
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+        
+    def _client(self) -> SuperMCPClient:
+        """Connected client, reconnecting if the previous session ended or failed"""
+        with self._lock:
+            failed = self._ready.done() and self._ready.exception() is not None
+            if failed or self._session_task.done():
+                self._connect()
+            ready = self._ready
+        return ready.result(timeout=Config.SUPERMCP_TIMEOUT)
+        
+    @staticmethod
+    def _connection_error(e: Exception) -> Dict[str, Any]:
+        if isinstance(e, concurrent.futures.TimeoutError):
+            return {"error": f"SuperMCP did not connect within {Config.SUPERMCP_TIMEOUT} seconds"}
+        return {"error": f"Failed to connect to SuperMCP: {e}"}
+        
+    def _run(self, operation):
+        """Run an async client operation on the session's event loop"""
+        try:
+            client = self._client()
+        except Exception as e:
+            return self._connection_error(e)
+        return asyncio.run_coroutine_threadsafe(
+            self._run_async(client, operation), self._loop
+        ).result()
+        
+    async def _run_async(self, client, operation):
+        """Helper to run an async operation with the configured timeout"""
+        try:
+            return await asyncio.wait_for(operation(client), timeout=client.timeout)
+        except asyncio.TimeoutError:
+            return {"error": f"SuperMCP operation timed out after {client.timeout} seconds"}
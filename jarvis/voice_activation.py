@@ -1,7 +1,15 @@
+import math
+import re
 import threading
 import time
 from typing import Callable, Optional, List
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
+
+# Seconds of quiet audio still decoded after speech, so the recognizer
+# sees the end of the utterance before silent chunks are skipped
+SILENCE_HANGOVER = 1.0
+# Seconds after a detection during which further wake words are ignored
+WAKE_WORD_DEBOUNCE = 2.0
 
 class VoiceActivation:
     """
@@ -19,7 +27,9 @@ class VoiceActivation:
         sample_rate: int = 16000,
         chunk_size: int = 4000,
         sensitivity: float = 0.8,
-        on_wake_word: Optional[Callable[[], None]] = None
+        on_wake_word: Optional[Callable[[], None]] = None,
+        silence_threshold: int = 0,
+        use_grammar: bool = True
     ):
         """
         Initialize voice activation.
@@ -31,54 +41,95 @@ class VoiceActivation:
             chunk_size: Audio chunk size for processing
             sensitivity: Wake word detection sensitivity (0.0 to 1.0)
             on_wake_word: Callback function called when wake word is detected
+            silence_threshold: RMS level (int16 scale) below which a chunk is
+                               silence and isn't decoded; 0 decodes everything
+            use_grammar: Restrict the recognizer to the wake words (anything
+                         else decodes as [unk]), which is much cheaper than
+                         the full vocabulary. Models without runtime graph
+                         support ignore it
         """
         self.wake_words = [word.lower() for word in wake_words]
+        # Vosk emits lowercase text, so the raw result JSON can be scanned
+        # for wake words before paying for a parse
+        self._wake_pattern = re.compile("|".join(
+            re.escape(word) for word in sorted(self.wake_words, key=len, reverse=True)
+        ))
         self.model_path = model_path
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.sensitivity = sensitivity
         self.on_wake_word = on_wake_word
+        self.use_grammar = use_grammar
+        
+        # Silence gate: decoding is the expensive part, and an idle room is
+        # mostly silence. Compared as squared sums to skip the square root
+        self.silence_threshold = silence_threshold
+        self._silence_energy = float(silence_threshold) ** 2
+        self._hangover_chunks = math.ceil(SILENCE_HANGOVER * sample_rate / chunk_size)
+        self._silent_chunks = 0
         
         # Import Vosk components
         try:
             import vosk
-            import pyaudio
+            import sounddevice
+            import numpy
             import json
             self.vosk = vosk
-            self.pyaudio = pyaudio
+            self.sounddevice = sounddevice
+            self.np = numpy
             self.json = json
+            try:
+                # Parses recognizer results several times faster when installed
+                from orjson import loads as json_loads
+            except ImportError:
+                json_loads = json.loads
+            self._json_loads = json_loads
         except ImportError as e:
-            raise ImportError(f"Required dependencies not found: {e}. Please install: pip install vosk pyaudio")
+            raise ImportError(f"Required dependencies not found: {e}. Please install: pip install vosk sounddevice")
         
         # Vosk components
         self._model = None
         self._recognizer = None
         
-        # PyAudio components
-        self._audio = None
+        # Audio input: the stream callback queues chunks for the listening thread
         self._stream = None
+        self._chunks = Queue(maxsize=32)
         
         # Threading
         self._listening_thread = None
         self._running = threading.Event()
-        self._activation_queue = Queue()
+        # Bounded: VoiceManager uses the callback and never reads this queue
+        self._activation_queue = Queue(maxsize=16)
         
         # Statistics
         self._detection_count = 0
         self._last_detection_time = 0.0
+        self._debounce_until = 0.0  # time.monotonic() deadline
         
-    def initialize(self) -> bool:
+    def initialize(self, model=None) -> bool:
         """
         Initialize Vosk and audio system.
         
+        Args:
+            model: Already loaded vosk.Model to use instead of loading
+                   model_path (e.g. the one speech-to-text uses)
+        
         Returns:
             True if initialization successful, False otherwise
         """
+        if self._recognizer is not None:
+            return True  # already loaded (e.g. preloaded at startup)
         try:
             # Initialize Vosk model
-            print(f"Loading Vosk model from: {self.model_path}")
-            self._model = self.vosk.Model(self.model_path)
-            self._recognizer = self.vosk.KaldiRecognizer(self._model, self.sample_rate)
+            if model is None:
+                print(f"Loading Vosk model from: {self.model_path}")
+                model = self.vosk.Model(self.model_path)
+            self._model = model
+            if self.use_grammar:
+                grammar = self.json.dumps(self.wake_words + ["[unk]"])
+                self._recognizer = self.vosk.KaldiRecognizer(self._model, self.sample_rate, grammar)
+            else:
+                self._recognizer = self.vosk.KaldiRecognizer(self._model, self.sample_rate)
             
             print(f"Voice Activation initialized:")
             print(f"   Wake words: {', '.join(self.wake_words)}")
@@ -107,24 +158,20 @@ class VoiceActivation:
                 return False
         
         try:
-            # Initialize PyAudio
-            self._audio = self.pyaudio.PyAudio()
-            
-            # Build stream parameters
-            stream_params = {
-                'format': self.pyaudio.paInt16,
-                'channels': 1,
-                'rate': self.sample_rate,
-                'input': True,
-                'frames_per_buffer': self.chunk_size
-            }
-            
-            self._stream = self._audio.open(**stream_params)
+            self._stream = self.sounddevice.RawInputStream(
+                samplerate=self.sample_rate,
+                blocksize=self.chunk_size,
+                dtype='int16',
+                channels=1,
+                callback=self._audio_callback
+            )
+            self._stream.start()
             
             # Start listening thread
             self._running.set()
             self._listening_thread = threading.Thread(
                 target=self._listen_loop, 
+                name="wake-word-listener",
                 daemon=True
             )
             self._listening_thread.start()
@@ -144,74 +191,128 @@ class VoiceActivation:
             
         self._running.clear()
         
-        # Wait for thread to finish
-        if self._listening_thread:
-            self._listening_thread.join(timeout=2.0)
-            self._listening_thread = None
-        
         # Cleanup audio
         if self._stream:
             try:
-                self._stream.stop_stream()
+                self._stream.stop()
                 self._stream.close()
             except Exception:
                 pass
             self._stream = None
-            
-        if self._audio:
+        
+        # Wait for thread to finish (its read times out once audio stops)
+        if self._listening_thread:
+            self._listening_thread.join(timeout=2.0)
+            self._listening_thread = None
+        
+        while not self._chunks.empty():
             try:
-                self._audio.terminate()
-            except Exception:
-                pass
-            self._audio = None
+                self._chunks.get_nowait()
+            except Empty:
+                break
         
         print("Voice activation stopped")
     
+    def _audio_callback(self, indata, frames, time_info, status) -> None:
+        """Audio thread: queue a copy of the block, dropping the oldest if the listener lags."""
+        self._queue_latest(self._chunks, bytes(indata))
+    
+    @staticmethod
+    def _queue_latest(q: Queue, item) -> None:
+        """Queue item without blocking; if q is full, the oldest entry makes room."""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except Full:
+                try:
+                    q.get_nowait()
+                except Empty:
+                    pass
+    
     def _listen_loop(self) -> None:
         """Main listening loop running in separate thread."""
         try:
             while self._running.is_set():
-                # Read audio frame
-                data = self._stream.read(self.chunk_size, exception_on_overflow=False)
-                
-                if self._recognizer.AcceptWaveform(data):
-                    # Final result
-                    result = self.json.loads(self._recognizer.Result())
-                    text = result.get('text', '').lower().strip()
-                    
-                    if text:
-                        self._check_for_wake_word(text)
-                else:
-                    # Partial result - check for wake words in real-time
-                    partial = self.json.loads(self._recognizer.PartialResult())
-                    partial_text = partial.get('partial', '').lower().strip()
-                    
-                    if partial_text:
-                        self._check_for_wake_word(partial_text)
+                try:
+                    data = self._chunks.get(timeout=0.5)
+                except Empty:
+                    continue
+                self.process_audio(data)
                         
         except Exception as e:
             print(f"Error in listening loop: {e}")
         finally:
             self._running.clear()
     
+    def process_audio(self, data: bytes) -> None:
+        """
+        Run one chunk of 16-bit mono audio through the recognizer and check it
+        for wake words. Lets a caller that owns the microphone feed frames
+        instead of start_listening() opening its own stream.
+        
+        Args:
+            data: Raw int16 PCM audio
+        """
+        if self.silence_threshold and self._is_silence(data):
+            self._silent_chunks += 1
+            if self._silent_chunks > self._hangover_chunks:
+                if self._silent_chunks == self._hangover_chunks + 1:
+                    # Speech is over: flush what the recognizer still holds
+                    self._check_result(self._recognizer.FinalResult(), 'text')
+                return  # don't decode silence
+        else:
+            self._silent_chunks = 0
+        
+        if self._recognizer.AcceptWaveform(data):
+            # Final result
+            raw = self._recognizer.Result()
+            key = 'text'
+        else:
+            # Partial result - check for wake words in real-time
+            raw = self._recognizer.PartialResult()
+            key = 'partial'
+        self._check_result(raw, key)
+    
+    def _is_silence(self, data: bytes) -> bool:
+        """True if the chunk's RMS level is below silence_threshold."""
+        samples = self.np.frombuffer(data, dtype=self.np.int16).astype(self.np.float32)
+        return float(samples.dot(samples)) < self._silence_energy * len(samples)
+    
+    def _check_result(self, raw: str, key: str) -> None:
+        """Look for wake words in a recognizer result (JSON text)."""
+        # Checked first: right after a detection no text work is needed
+        if time.monotonic() < self._debounce_until:
+            return
+        if not self._wake_pattern.search(raw):
+            return
+        # Vosk output is already lowercase
+        text = self._json_loads(raw).get(key, '').strip()
+        
+        if text:
+            self._check_for_wake_word(text)
+    
+    def reset(self) -> None:
+        """Discard partially recognized speech (e.g. after audio was routed elsewhere)."""
+        if self._recognizer:
+            self._recognizer.Reset()
+        self._silent_chunks = 0
+    
     def _check_for_wake_word(self, text: str) -> None:
         """Check if the given text contains any wake words."""
         current_time = time.time()
         
-        # Prevent multiple detections within 2 seconds
-        if current_time - self._last_detection_time < 2.0:
-            return
-        
-        # Check if any wake word is in the text
-        for wake_word in self.wake_words:
-            if wake_word in text:
-                self._handle_wake_word_detection(wake_word, text, current_time)
-                break
+        # One pass over the text for all wake words (the pattern is built once)
+        match = self._wake_pattern.search(text)
+        if match:
+            self._handle_wake_word_detection(match.group(), text, current_time)
     
     def _handle_wake_word_detection(self, wake_word: str, full_text: str, current_time: float) -> None:
         """Handle wake word detection."""
         self._detection_count += 1
         self._last_detection_time = current_time
+        # Prevent multiple detections within WAKE_WORD_DEBOUNCE seconds
+        self._debounce_until = time.monotonic() + WAKE_WORD_DEBOUNCE
         
         print(f"   WAKE WORD DETECTED!")
         print(f"   Word: '{wake_word}'")
@@ -219,8 +320,8 @@ class VoiceActivation:
         print(f"   Detection #{self._detection_count}")
         print(f"   Time: {time.strftime('%H:%M:%S')}")
         
-        # Queue the activation
-        self._activation_queue.put({
+        # Queue the activation, dropping the oldest one nobody collected
+        self._queue_latest(self._activation_queue, {
             'wake_word': wake_word,
             'full_text': full_text,
             'timestamp': current_time,
@@ -259,7 +360,8 @@ class VoiceActivation:
             'detection_count': self._detection_count,
             'last_detection_time': self._last_detection_time,
             'is_listening': self.is_listening(),
-            'wake_words': self.wake_words.copy()
+            'wake_words': self.wake_words.copy(),
+            'queued_activations': self._activation_queue.qsize()
         }
     
     def cleanup(self) -> None:
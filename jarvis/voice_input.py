@@ -1,10 +1,156 @@
+import logging
 import threading
 import json
-import pyaudio
+import time
+import sounddevice as sd
 import vosk
-from queue import Queue, Empty
-from datetime import datetime, timedelta
-from typing import Callable, Generator, Optional, Tuple
+from queue import Queue, Empty, Full
+from typing import Callable, Dict, Generator, Optional, Tuple
+
+from .audio_devices import find_device
+
+# Partials arrive several times a second on the audio thread, so they are
+# logged (JARVIS_LOG=DEBUG) at most every PARTIAL_LOG_INTERVAL seconds
+# instead of printed
+log = logging.getLogger("jarvis.stt")
+PARTIAL_LOG_INTERVAL = 0.25
+
+# Vosk returns every result as JSON text; orjson parses it several times
+# faster than the stdlib on the per-chunk path
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+# Loaded Vosk models by path. Loading reads and compiles tens of MB, and a
+# model can be shared by any number of recognizers
+_MODEL_CACHE: Dict[str, vosk.Model] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def load_model(model_path: str) -> vosk.Model:
+    """Return the Vosk model at model_path, loading it only the first time."""
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(model_path)
+        if model is None:
+            print(f"Loading Vosk model from: {model_path}")
+            model = _MODEL_CACHE[model_path] = vosk.Model(model_path)
+        return model
+
+
+def clear_model_cache() -> None:
+    """Forget every cached model (e.g. between tests)."""
+    with _MODEL_LOCK:
+        _MODEL_CACHE.clear()
+
+def _put_dropping_oldest(q: Queue, item) -> None:
+    """Queue item without blocking; if q is full, the oldest entry makes room."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except Full:
+            try:
+                q.get_nowait()
+            except Empty:
+                pass
+
+
+class Microphone:
+    """
+    16-bit mono microphone input delivered as fixed-size chunks.
+
+    PortAudio calls the stream callback on its own thread, and the callback
+    only copies each block into a bounded queue. A slow recognizer therefore
+    can't make the device overrun. When the reader falls behind, the oldest
+    chunks are dropped so recognition stays real-time.
+
+    Usage:
+        mic = Microphone(sample_rate=16000, chunk_size=4000)
+        mic.start()
+        for data in iter(mic.read, None):  # ends when close() is called
+            recognizer.AcceptWaveform(data)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        chunk_size: int = 4000,
+        device_index: Optional[int] = None,
+        max_chunks: int = 32,
+        host_api: Optional[str] = None,
+        wasapi_exclusive: bool = False,
+    ):
+        """
+        Args:
+            sample_rate: Audio sample rate
+            chunk_size: Frames per chunk
+            device_index: Audio device index (None picks one, see find_device())
+            max_chunks: Chunks buffered before the oldest are dropped
+            host_api: Audio host API to capture through (e.g. "WASAPI")
+            wasapi_exclusive: Take the input device in WASAPI exclusive mode
+        """
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.device_index = device_index
+        self.host_api = host_api
+        self.wasapi_exclusive = wasapi_exclusive
+        self._chunks: Queue[Optional[bytes]] = Queue(maxsize=max_chunks)
+        self._stream: Optional[sd.RawInputStream] = None
+
+    def start(self) -> None:
+        """Open the input device and start capturing."""
+        # Forget audio (and the end marker) left over from a previous run
+        self._drain()
+        device, extra_settings = self.device_index, None
+        if device is None:
+            device, extra_settings = find_device(
+                "input", self.host_api, self.wasapi_exclusive,
+                samplerate=self.sample_rate, channels=1, dtype='int16')
+        self._stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.chunk_size,
+            dtype='int16',
+            channels=1,
+            device=device,
+            extra_settings=extra_settings,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata, frames, time_info, status) -> None:
+        """PortAudio thread: queue a copy of the block, nothing more."""
+        _put_dropping_oldest(self._chunks, bytes(indata))
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Next chunk of audio. None once the microphone is closed (or on timeout)."""
+        try:
+            return self._chunks.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def close(self) -> None:
+        """Stop capturing and release a blocked read(). Safe to call more than once."""
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        try:
+            stream.stop()
+            stream.close()
+        except Exception:
+            pass
+        # No more callbacks: drop unread audio and mark the end of the stream
+        self._drain()
+        self._chunks.put_nowait(None)
+
+    def _drain(self) -> None:
+        """Discard every queued chunk."""
+        try:
+            while True:
+                self._chunks.get_nowait()
+        except Empty:
+            pass
+
 
 class SpeechToText:
     """
@@ -47,24 +193,25 @@ class SpeechToText:
         self.silence_timeout = silence_timeout
         self.device_index = device_index
 
-        # I/O queues
-        self._result_q: Queue[Tuple[str, bool]] = Queue()  # (text, is_final)
+        # I/O queues. Bounded so a consumer that stops reading can't grow it
+        # without limit; the oldest results are dropped first
+        self._result_q: Queue[Optional[Tuple[str, bool]]] = Queue(maxsize=64)  # (text, is_final); None ends the stream
 
         # Vosk components
         self._model: Optional[vosk.Model] = None
         self._recognizer: Optional[vosk.KaldiRecognizer] = None
         
-        # PyAudio components
-        self._audio: Optional[pyaudio.PyAudio] = None
-        self._stream: Optional[pyaudio.Stream] = None
+        # Microphone (only opened by start())
+        self._microphone: Optional[Microphone] = None
 
         # Processing thread state
         self._worker_thread: Optional[threading.Thread] = None
         self._running = threading.Event()
 
         # Transcription state
-        self._last_speech_time: Optional[datetime] = None
+        self._last_speech_time: Optional[float] = None  # time.monotonic()
         self._last_emitted_text = ""  # for coalescing partials
+        self._next_partial_log = 0.0  # time.monotonic()
         self._current_phrase = ""
 
         # Optional callback for push updates
@@ -73,13 +220,10 @@ class SpeechToText:
     @staticmethod
     def list_audio_devices() -> None:
         """List available audio input devices."""
-        audio = pyaudio.PyAudio()
         print("Available audio input devices:")
-        for i in range(audio.get_device_count()):
-            info = audio.get_device_info_by_index(i)
-            if info['maxInputChannels'] > 0:
-                print(f"[{i}] {info['name']} (channels: {info['maxInputChannels']})")
-        audio.terminate()
+        for i, info in enumerate(sd.query_devices()):
+            if info['max_input_channels'] > 0:
+                print(f"[{i}] {info['name']} (channels: {info['max_input_channels']})")
 
     def on_update(self, cb: Callable[[str, bool], None]) -> None:
         """Register a callback called as `cb(text, is_final)`."""
@@ -91,34 +235,17 @@ class SpeechToText:
             return
             
         try:
-            # Load Vosk model
-            print(f"Loading Vosk model from: {self.model_path}")
-            self._model = vosk.Model(self.model_path)
-            self._recognizer = vosk.KaldiRecognizer(self._model, self.sample_rate)
-            print("✅ Vosk model loaded successfully")
-
-            # Initialize PyAudio
-            self._audio = pyaudio.PyAudio()
-            
-            # Build stream parameters
-            stream_params = {
-                'format': pyaudio.paInt16,
-                'channels': 1,
-                'rate': self.sample_rate,
-                'input': True,
-                'frames_per_buffer': self.chunk_size
-            }
-            
-            # Add device_index only if specified
-            if self.device_index is not None:
-                stream_params['input_device_index'] = self.device_index
-            
-            self._stream = self._audio.open(**stream_params)
+            self.load()
+
+            self._microphone = Microphone(self.sample_rate, self.chunk_size, self.device_index)
+            self._microphone.start()
             print("✅ Audio stream initialized")
 
             # Start processing thread
             self._running.set()
-            self._worker_thread = threading.Thread(target=self._process_loop, daemon=True)
+            self._worker_thread = threading.Thread(
+                target=self._process_loop, name="stt-worker", daemon=True
+            )
             self._worker_thread.start()
             print("✅ Speech-to-text processing started")
 
@@ -127,35 +254,52 @@ class SpeechToText:
             self.stop()
             raise
 
+    def load(self) -> None:
+        """Load the Vosk model and recognizer without opening the microphone."""
+        if self._recognizer is not None:
+            return
+        self._model = load_model(self.model_path)
+        self._recognizer = vosk.KaldiRecognizer(self._model, self.sample_rate)
+        print("✅ Vosk model loaded successfully")
+
+    @property
+    def model(self) -> Optional[vosk.Model]:
+        """The loaded Vosk model (None until load() or start())."""
+        return self._model
+
+    def reset(self) -> None:
+        """Start a new utterance: clear recognizer state and pending results."""
+        if self._recognizer is not None:
+            self._recognizer.Reset()
+        self._drain_queue(self._result_q)
+        self._last_speech_time = None
+        self._last_emitted_text = ""
+        self._current_phrase = ""
+
+    def end_results(self) -> None:
+        """Make read() and iter_results() consumers return (no more audio is coming)."""
+        _put_dropping_oldest(self._result_q, None)
+
     def stop(self) -> None:
-        """Stop processing and cleanup resources."""
-        if not self._running.is_set():
+        """Stop processing and cleanup resources. Safe to call more than once."""
+        # Also release a model loaded by load() or a half-finished start()
+        if (not self._running.is_set() and self._recognizer is None
+                and self._microphone is None):
             return
             
         self._running.clear()
 
+        # Close the microphone first: that ends the worker's blocking read
+        if self._microphone:
+            self._microphone.close()
+            self._microphone = None
+
         # Wait for thread to finish
         if self._worker_thread:
             self._worker_thread.join(timeout=2.0)
             self._worker_thread = None
 
-        # Close audio stream
-        if self._stream:
-            try:
-                self._stream.stop_stream()
-                self._stream.close()
-            except Exception:
-                pass
-            self._stream = None
-
-        if self._audio:
-            try:
-                self._audio.terminate()
-            except Exception:
-                pass
-            self._audio = None
-
-        # Release Vosk model
+        # Release the recognizer; the model stays cached for the next load()
         self._recognizer = None
         self._model = None
 
@@ -179,56 +323,73 @@ class SpeechToText:
 
     def _process_loop(self) -> None:
         """Main processing loop: read audio, transcribe with Vosk, emit results."""
-        while self._running.is_set():
-            try:
-                # Read audio chunk
-                data = self._stream.read(self.chunk_size, exception_on_overflow=False)
-                
-                if self._recognizer.AcceptWaveform(data):
-                    # Final result
-                    result = json.loads(self._recognizer.Result())
-                    text = result.get('text', '').strip()
-                    
-                    if text:
-                        self._current_phrase = text
-                        self._last_speech_time = datetime.utcnow()
-                        self._emit(text, is_final=True)
-                        self._last_emitted_text = text
-                        print(f"📝 FINAL: {text}")
-                else:
-                    # Partial result
-                    partial = json.loads(self._recognizer.PartialResult())
-                    partial_text = partial.get('partial', '').strip()
-                    
-                    if partial_text and partial_text != self._last_emitted_text:
-                        self._last_speech_time = datetime.utcnow()
-                        self._emit(partial_text, is_final=False)
-                        self._last_emitted_text = partial_text
-                        print(f"🔄 PARTIAL: {partial_text}", end='\r')
-                
-                # Check for silence timeout
-                if self._last_speech_time:
-                    silence_duration = datetime.utcnow() - self._last_speech_time
-                    if silence_duration > timedelta(seconds=self.silence_timeout):
-                        if self._current_phrase and self._current_phrase != self._last_emitted_text:
-                            # Emit the current phrase as final
-                            self._emit(self._current_phrase, is_final=True)
-                            self._last_emitted_text = self._current_phrase
-                            print(f"📝 FINAL (silence): {self._current_phrase}")
-                        self._current_phrase = ""
-                        self._last_speech_time = None
-                        
-            except Exception as e:
-                if self._running.is_set():  # Only print error if we're still supposed to be running
-                    print(f"❌ Error in processing loop: {e}")
-                break
+        try:
+            self._transcribe_loop()
+        finally:
+            # Wake any consumer blocked in iter_results()
+            self.end_results()
+
+    def _transcribe_loop(self) -> None:
+        """Read audio and transcribe it until stopped or an error occurs."""
+        microphone = self._microphone
+        try:
+            # Chunks arrive from the microphone callback; None means it closed
+            for data in iter(microphone.read, None):
+                if not self._running.is_set():
+                    break
+                self.process_audio(data)
+        except Exception as e:
+            if self._running.is_set():  # Only print error if we're still supposed to be running
+                print(f"❌ Error in processing loop: {e}")
+
+    def process_audio(self, data: bytes) -> None:
+        """
+        Transcribe one chunk of 16-bit mono audio and emit any results.
+
+        Used by the internal microphone loop, and by callers that own the
+        audio stream themselves (call load() first).
+        """
+        now = time.monotonic()
+        if self._recognizer.AcceptWaveform(data):
+            # Final result
+            result = _loads(self._recognizer.Result())
+            text = result.get('text', '').strip()
+            
+            if text:
+                self._current_phrase = text
+                self._last_speech_time = now
+                self._emit(text, is_final=True)
+                self._last_emitted_text = text
+                print(f"📝 FINAL: {text}")
+        else:
+            # Partial result
+            partial = _loads(self._recognizer.PartialResult())
+            partial_text = partial.get('partial', '').strip()
+            
+            if partial_text and partial_text != self._last_emitted_text:
+                self._last_speech_time = now
+                self._emit(partial_text, is_final=False)
+                self._last_emitted_text = partial_text
+                if now >= self._next_partial_log:
+                    log.debug("PARTIAL: %s", partial_text)
+                    self._next_partial_log = now + PARTIAL_LOG_INTERVAL
+        
+        # Check for silence timeout
+        if self._last_speech_time is not None:
+            if now - self._last_speech_time > self.silence_timeout:
+                if self._current_phrase and self._current_phrase != self._last_emitted_text:
+                    # Emit the current phrase as final
+                    self._emit(self._current_phrase, is_final=True)
+                    self._last_emitted_text = self._current_phrase
+                    print(f"📝 FINAL (silence): {self._current_phrase}")
+                # Phrase over: start the next one from a clean decoder state
+                self._recognizer.Reset()
+                self._current_phrase = ""
+                self._last_speech_time = None
 
     def _emit(self, text: str, is_final: bool) -> None:
         """Emit a transcription result."""
-        try:
-            self._result_q.put_nowait((text, is_final))
-        except Exception:
-            pass
+        _put_dropping_oldest(self._result_q, (text, is_final))
         if self._on_update:
             try:
                 self._on_update(text, is_final)
@@ -236,20 +397,31 @@ class SpeechToText:
                 pass
 
     def iter_results(self) -> Generator[Tuple[str, bool], None, None]:
-        """Yield (text, is_final) as they arrive. Blocks."""
-        while self._running.is_set():
-            try:
-                yield self._result_q.get(timeout=0.1)
-            except Empty:
-                continue
+        """Yield (text, is_final) as they arrive. Blocks until processing stops."""
+        if not self._running.is_set():
+            return
+        while True:
+            item = self._result_q.get()
+            if item is None:  # processing loop has exited
+                return
+            yield item
 
     def read(self, timeout: Optional[float] = None) -> Optional[Tuple[str, bool]]:
         """Pop one result (text, is_final). None if no result before `timeout`."""
         try:
+            # None is also returned for the end-of-stream marker
             return self._result_q.get(timeout=timeout)
         except Empty:
             return None
 
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
     def is_running(self) -> bool:
         """Check if speech-to-text is currently running."""
         return self._running.is_set()
@@ -262,5 +434,6 @@ class SpeechToText:
             'sample_rate': self.sample_rate,
             'chunk_size': self.chunk_size,
             'current_phrase': self._current_phrase,
-            'last_emitted_text': self._last_emitted_text
+            'last_emitted_text': self._last_emitted_text,
+            'queued_results': self._result_q.qsize()
         }
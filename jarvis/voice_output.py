@@ -1,18 +1,251 @@
+import json
+import os
 import numpy as np
+import onnxruntime
 import sounddevice as sd
+from piper.config import PiperConfig
 from piper.voice import PiperVoice
-import time
+import threading
+from pathlib import Path
+from queue import Full, Queue
+
+from .audio_devices import find_device
+
+
+def _gpu_providers(tensorrt: bool = False) -> list:
+    """
+    GPU execution providers ONNX Runtime can use here, best first (empty without a GPU).
+
+    cuDNN's exhaustive convolution search benchmarks every new input shape,
+    and each sentence is a new length for Piper, so the heuristic choice is
+    used instead. TensorRT is faster still but builds an engine per shape
+    and has been unreliable with Piper voices, so it is opt-in.
+    """
+    available = onnxruntime.get_available_providers()
+    providers = []
+    if tensorrt and "TensorrtExecutionProvider" in available:
+        providers.append(("TensorrtExecutionProvider", {"device_id": 0}))
+    if "CUDAExecutionProvider" in available:
+        providers.append(("CUDAExecutionProvider",
+                          {"device_id": 0, "cudnn_conv_algo_search": "HEURISTIC"}))
+    return providers
+
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on (respects taskset/container limits where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 2
+
+
+def default_session_options(threads: int = None) -> onnxruntime.SessionOptions:
+    """
+    ONNX Runtime settings for the TTS session.
+
+    By default ORT starts one intra-op thread per logical core. Hyperthreads
+    add little to Piper's GEMM-bound layers, and the extra threads compete
+    with Vosk and the audio threads. Half the logical cores (about one per
+    physical core on SMT machines) and a single inter-op thread (the Piper
+    graph is sequential anyway) leave room for them.
+
+    Args:
+        threads: Intra-op thread count to use instead of the default
+    """
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads or max(1, _usable_cpus() // 2)
+    options.inter_op_num_threads = 1
+    options.enable_cpu_mem_arena = True
+    return options
+
+
+def optimized_model_path(model_path: str) -> Path:
+    """Where the graph-optimized copy of a voice is cached (voice.onnx -> voice.optimized.onnx)."""
+    return Path(model_path).with_suffix(".optimized.onnx")
+
+
+def _create_session(model_path: str, options: onnxruntime.SessionOptions,
+                    providers: list, cache_optimized: bool) -> onnxruntime.InferenceSession:
+    """
+    Create the ORT session, reusing a cached optimized graph when possible.
+
+    Graph optimization (fusions, constant folding) runs on every session
+    creation. The first run saves its result next to the voice; later runs
+    load that file with optimization turned off. The cache is rebuilt when
+    the voice file is newer than it.
+    """
+    optimized = optimized_model_path(model_path)
+    if not cache_optimized:
+        return onnxruntime.InferenceSession(model_path, sess_options=options, providers=providers)
+    
+    if optimized.is_file() and optimized.stat().st_mtime >= os.path.getmtime(model_path):
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return onnxruntime.InferenceSession(str(optimized), sess_options=options, providers=providers)
+    
+    options.optimized_model_filepath = str(optimized)
+    try:
+        return onnxruntime.InferenceSession(model_path, sess_options=options, providers=providers)
+    except Exception:
+        # e.g. a read-only models directory: run without the cache
+        options.optimized_model_filepath = ""
+        return onnxruntime.InferenceSession(model_path, sess_options=options, providers=providers)
+
 
 class TextToSpeech:
-    def __init__(self, model_path: str, config_path: str):
-        self.tts = PiperVoice.load(model_path=model_path, config_path=config_path)
-        self.device_index = sd.default.device[1]
+    def __init__(self, model_path: str, config_path: str,
+                 session_options: onnxruntime.SessionOptions = None,
+                 cache_optimized: bool = True, host_api: str = None,
+                 tensorrt: bool = False, wasapi_exclusive: bool = False):
+        """
+        Args:
+            model_path: Piper voice (.onnx)
+            config_path: The voice's .onnx.json config
+            session_options: ONNX Runtime options (default_session_options() if None)
+            cache_optimized: Save the optimized graph next to the voice and
+                             load it on later starts (CPU only; a GPU-optimized
+                             graph can't run on the CPU fallback)
+            host_api: Audio host API to play through (e.g. "WASAPI"); by
+                      default the lowest-latency one that supports the voice
+            tensorrt: Try TensorRT before CUDA when both are available
+            wasapi_exclusive: Take the output device in WASAPI exclusive mode
+                              (other applications lose it while JARVIS runs)
+        """
+        # Built here instead of PiperVoice.load(), which has no way to pass
+        # session options
+        providers = _gpu_providers(tensorrt)
+        if providers:
+            providers.append("CPUExecutionProvider")
+            cache_optimized = False
+        else:
+            providers = [("CPUExecutionProvider", {"use_arena": "1"})]
+        with open(config_path, "r", encoding="utf-8") as config_file:
+            config = PiperConfig.from_dict(json.load(config_file))
+        self.tts = PiperVoice(
+            session=_create_session(
+                model_path,
+                session_options or default_session_options(),
+                providers,
+                cache_optimized,
+            ),
+            config=config,
+        )
+        self.device_index, self._extra_settings = find_device(
+            "output", host_api, wasapi_exclusive,
+            samplerate=config.sample_rate, channels=1, dtype="int16")
+        if self.device_index is None:
+            self.device_index = sd.default.device[1]
+        self._stream = None  # opened on first use, kept until close()
+        self._held = False  # between begin() and end()
+        # One synthesis at a time on the ORT session; a reply that arrives
+        # during the background warm_up() waits for it instead of racing it
+        self._synthesis_lock = threading.Lock()
+
+    def warm_up(self):
+        """
+        Run one short synthesis and discard it, so the first say() skips
+        ONNX Runtime warm-up. Also has PortAudio query the output device,
+        which reports unsupported settings now instead of at the first answer.
+        """
+        for _ in self._synthesize("Hi."):
+            pass
+        sd.check_output_settings(device=self.device_index, channels=1, dtype="int16",
+                                 samplerate=self.tts.config.sample_rate,
+                                 extra_settings=self._extra_settings)
+
+    def _synthesize(self, text: str):
+        """PiperVoice.synthesize(), holding the synthesis lock until the last chunk."""
+        with self._synthesis_lock:
+            yield from self.tts.synthesize(text)
+
+    def _start_stream(self) -> sd.RawOutputStream:
+        """
+        Start the output stream, opening the device only the first time.
+
+        Reopening PortAudio for every answer renegotiates the device buffers
+        and can glitch; between answers the stream is just stopped.
+        """
+        if self._stream is None:
+            self._stream = sd.RawOutputStream(samplerate=self.tts.config.sample_rate,
+                                              channels=1, dtype="int16",
+                                              device=self.device_index, blocksize=0,
+                                              extra_settings=self._extra_settings)
+        if self._stream.stopped:
+            self._stream.start()
+        return self._stream
+
+    def _stop_stream(self, stream: sd.RawOutputStream):
+        """Wait for queued audio to play and stop, unless begin() holds the stream open."""
+        if not self._held:
+            stream.stop()
+
+    def begin(self):
+        """
+        Keep the output stream started across the following say()/stream_say()
+        calls until end().
+
+        Stopping drains the device buffer, so stopping after every sentence
+        of a streamed reply would leave a gap between sentences.
+        """
+        self._start_stream()
+        self._held = True
+
+    def end(self):
+        """Let queued audio finish playing and stop the stream started by begin()."""
+        self._held = False
+        if self._stream is not None:
+            self._stream.stop()
 
     def say(self, text: str):
-        sr = self.tts.config.sample_rate
-        # RawOutputStream expects int16 PCM bytes
-        with sd.RawOutputStream(samplerate=sr, channels=1, dtype="int16",
-                                device=self.device_index, blocksize=0) as stream:
-            for chunk in self.tts.synthesize(text):
-                stream.write(chunk.audio_int16_bytes)
-                time.sleep(0.4)
\ No newline at end of file
+        # RawOutputStream takes any int16 buffer, so Piper's sample array is
+        # written as-is instead of copied to bytes first. write() blocks while
+        # the device buffer is full, and stop() waits for the queued audio to
+        # finish playing, so no sleeps are needed
+        stream = self._start_stream()
+        try:
+            for chunk in self._synthesize(text):
+                stream.write(chunk.audio_int16_array)
+        finally:
+            self._stop_stream(stream)
+
+    def stream_say(self, text: str):
+        """Like say(), but synthesizes the next sentence while the current one plays."""
+        # Piper yields one chunk per sentence; a small queue keeps synthesis
+        # at most two sentences ahead of playback
+        chunks = Queue(maxsize=2)
+
+        # Set when playback ends early (device error, Ctrl-C) so the
+        # producer stops instead of blocking on a queue nobody reads
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        def synthesize():
+            try:
+                for chunk in self._synthesize(text):
+                    if not put(chunk.audio_int16_array):
+                        return
+            finally:
+                put(None)
+
+        threading.Thread(target=synthesize, daemon=True).start()
+        stream = self._start_stream()
+        try:
+            for audio in iter(chunks.get, None):
+                stream.write(audio)
+        finally:
+            stopped.set()
+            self._stop_stream(stream)
+
+    def close(self):
+        """Close the audio output device. Safe to call more than once."""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.close()
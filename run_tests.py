@@ -5,10 +5,12 @@ Simple test runner for JARVIS
 This script runs the available unit tests for the JARVIS project.
 """
 
-import subprocess
+import importlib.util
 import sys
 from pathlib import Path
 
+import pytest
+
 def main():
     """Run all available tests"""
     print("🧪 JARVIS Unit Test Suite")
@@ -22,15 +24,19 @@ def main():
     try:
         # Run the working config tests
         print("\n📋 Running Config Tests...")
-        result = subprocess.run([
-            sys.executable, "-m", "pytest", 
+        args = [
             "tests/test_config_direct.py", 
             "-v", 
             "--tb=short",
             "--color=yes"
-        ], capture_output=False)
+        ]
+        # Spread tests over one worker per CPU when pytest-xdist (dev extra) is installed
+        if importlib.util.find_spec("xdist"):
+            args += ["-n", "auto"]
+        # In-process: no second interpreter start, and Ctrl-C reaches pytest directly
+        returncode = pytest.main(args)
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("\n✅ Config tests passed!")
         else:
             print("\n❌ Config tests failed!")
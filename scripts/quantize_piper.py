@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Quantize a Piper TTS voice to int8
+
+Writes an int8 copy of the voice next to the original
+(e.g. en_US-libritts_r-medium.onnx -> en_US-libritts_r-medium.int8.onnx).
+ComponentFactory.create_tts loads the int8 copy when it exists, which
+roughly halves synthesis time on CPU. The voice's .onnx.json config is
+used unchanged. Copies made by older versions of this script used uint8
+MatMul weights, which run slower; rerun it to replace them.
+
+Requirements:
+    pip install onnxruntime
+
+Usage:
+    python scripts/quantize_piper.py models/piper/en_US-libritts_r-medium.onnx
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+
+def int8_path(model_path):
+    """Path of the int8 copy of a Piper voice."""
+    return Path(model_path).with_suffix(".int8.onnx")
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/quantize_piper.py <voice.onnx>")
+        sys.exit(1)
+    
+    source = Path(sys.argv[1])
+    if not source.is_file():
+        print(f"Error: {source} not found")
+        sys.exit(1)
+    
+    target = int8_path(source)
+    print(f"Quantizing {source} -> {target} ...")
+    # Dynamic quantization makes activations uint8. Only the MatMul and Conv
+    # layers that dominate synthesis are quantized, in two passes:
+    # - MatMul gets signed int8 weights, for the u8s8 kernels ORT's CPU
+    #   provider is fastest with (VNNI on recent x86)
+    # - Conv keeps uint8 weights: the CPU provider only implements
+    #   ConvInteger for uint8, and int8 Conv weights make the voice fail to load
+    fd, matmul_only = tempfile.mkstemp(suffix=".onnx", dir=target.parent)
+    os.close(fd)
+    try:
+        quantize_dynamic(
+            str(source),
+            matmul_only,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            reduce_range=False,
+            op_types_to_quantize=["MatMul"],
+        )
+        quantize_dynamic(
+            matmul_only,
+            str(target),
+            weight_type=QuantType.QUInt8,
+            per_channel=True,
+            reduce_range=False,
+            op_types_to_quantize=["Conv"],
+        )
+    finally:
+        os.remove(matmul_only)
+    print(f"Done: {source.stat().st_size / 1e6:.1f} MB -> {target.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
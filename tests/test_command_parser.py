@@ -0,0 +1,144 @@
+"""
+Unit tests for jarvis.core.command_parser (SuperMCP command sequences)
+"""
+
+import pytest
+
+from jarvis.core.command_parser import SuperMCPCommandParser
+
+
+class RecordingClient:
+    """Stands in for SuperMCPClient; each call returns what it was called with"""
+
+    def reload_servers(self):
+        return ("reload_servers",)
+
+    def list_servers(self):
+        return ("list_servers",)
+
+    def inspect_server(self, server_name):
+        return ("inspect_server", server_name)
+
+    def call_server_tool(self, server_name, tool_name, arguments):
+        return ("call_server_tool", server_name, tool_name, arguments)
+
+
+class FakeSuperMCP:
+    """Runs each batch of client operations against a RecordingClient"""
+
+    def __init__(self):
+        self.batches = []
+
+    def batch_call(self, operations):
+        results = [operation(RecordingClient()) for operation in operations]
+        self.batches.append([result[0] for result in results])
+        return results
+
+
+@pytest.fixture
+def supermcp():
+    return FakeSuperMCP()
+
+
+@pytest.fixture
+def run(supermcp):
+    parser = SuperMCPCommandParser(supermcp)
+
+    def run(command_sequence):
+        result = parser.execute_command_sequence(command_sequence)
+        assert result["success"], result
+        return result["results"]
+    return run
+
+
+class TestCommandParser:
+    """Parsing of the command sequences the LLM writes"""
+
+    def test_sequence(self, run):
+        """Commands are split on ';' and run in order"""
+        assert run("reload_servers(); list_servers(); inspect_server(fs)") == [
+            ("reload_servers",), ("list_servers",), ("inspect_server", "fs")]
+
+    def test_only_reads_run_concurrently(self, run, supermcp):
+        """Tool calls and reloads run alone, in order; reads between them are batched"""
+        run("list_servers(); inspect_server(fs); call_server_tool(fs, mkdir, {path: a}); "
+            "call_server_tool(fs, write_file, {path: 'a/b'}); reload_servers(); inspect_server(fs)")
+        assert supermcp.batches == [
+            ["list_servers", "inspect_server"],
+            ["call_server_tool"],
+            ["call_server_tool"],
+            ["reload_servers"],
+            ["inspect_server"],
+        ]
+
+    def test_quoted_arguments(self, run):
+        """Commas, braces and ';' inside quotes belong to the argument"""
+        results = run('call_server_tool(shell, run, {"command": "ls a,b; echo }"}); list_servers()')
+        assert results == [
+            ("call_server_tool", "shell", "run", {"command": "ls a,b; echo }"}),
+            ("list_servers",),
+        ]
+
+    def test_bare_names(self, run):
+        """Unquoted server, tool and key names are taken as text"""
+        assert run("call_server_tool(fs, read_file, {path: '/repo', lines: [1, 2]})") == [
+            ("call_server_tool", "fs", "read_file", {"path": "/repo", "lines": [1, 2]})]
+
+    @pytest.mark.parametrize("command", [
+        "inspect_server(a)(b)",
+        "inspect_server(getattr(a, b))",
+        "call_server_tool(fs, read_file, {path: os.sep})",
+        "inspect_server(x=1)",
+        "call_server_tool(shell, run, {command: ls -la})",
+    ])
+    def test_rejects_non_literal_calls(self, run, command):
+        """Anything but one call of a bare name with literal arguments is an error"""
+        [result] = run(command)
+        assert "error" in result
+
+    @pytest.mark.parametrize("command, path", [
+        (r'call_server_tool(fs, read_file, {"path": "C:\\Users\\me"})', "C:\\Users\\me"),
+        (r'call_server_tool(fs, read_file, {"path": "C:\Users\me"})', "C:\\Users\\me"),
+        (r"call_server_tool(fs, read_file, {path: 'D:\data\logs'})", "D:\\data\\logs"),
+    ])
+    def test_windows_paths(self, run, command, path):
+        """Backslashes in paths are kept whether or not they are escaped"""
+        assert run(command) == [("call_server_tool", "fs", "read_file", {"path": path})]
+
+    def test_fallback(self, run):
+        """Arguments that aren't Python are split on top-level commas as text"""
+        assert run(r"inspect_server(C:\Program Files\server)") == [
+            ("inspect_server", "C:\\Program Files\\server")]
+        assert run("call_server_tool(shell, run, {command: cat ~/.bashrc})") == [
+            ("call_server_tool", "shell", "run", {})]
+
+    def test_spaces_before_parentheses(self, run):
+        """A space between the command name and its arguments is allowed"""
+        assert run("reload_servers (); list_servers (); inspect_server (fs)") == [
+            ("reload_servers",), ("list_servers",), ("inspect_server", "fs")]
+
+    @pytest.mark.parametrize("command", [
+        "call_server_tool(fs, read_file)",
+        "call_server_tool(fs, read_file, {path: '/a'}, extra)",
+    ])
+    def test_call_server_tool_arity(self, run, command):
+        """call_server_tool takes exactly a server, a tool and the arguments"""
+        [result] = run(command)
+        assert result["error"].startswith("Invalid call_server_tool format")
+
+    def test_unknown_command(self, run):
+        """Unknown commands report an error instead of running"""
+        [result] = run("delete_everything()")
+        assert result == {"error": "Unknown command: delete_everything()"}
+
+    @pytest.mark.parametrize("command, arguments", [
+        ("call_server_tool(fs, delete, {force: false, recursive: true, owner: null})",
+         {"force": False, "recursive": True, "owner": None}),
+        ("call_server_tool(fs, delete, {'force': False, 'recursive': True, 'owner': None})",
+         {"force": False, "recursive": True, "owner": None}),
+        ("call_server_tool(fs, delete, {mode: falsey, flags: [true, no]})",
+         {"mode": "falsey", "flags": [True, "no"]}),
+    ])
+    def test_constants(self, run, command, arguments):
+        """JSON and Python constants are values; other bare names stay text"""
+        assert run(command) == [("call_server_tool", "fs", "delete", arguments)]
@@ -12,26 +12,7 @@ from unittest.mock import patch
 jarvis_path = Path(__file__).parent.parent / 'jarvis'
 sys.path.insert(0, str(jarvis_path))
 
-# Mock all heavy dependencies before importing config
-import types
-
-# Create mock modules for heavy dependencies
-mock_modules = {
-    'torch': types.ModuleType('torch'),
-    'whisper': types.ModuleType('whisper'),
-    'piper': types.ModuleType('piper'),
-    'sounddevice': types.ModuleType('sounddevice'),
-    'speech_recognition': types.ModuleType('speech_recognition'),
-    'ollama': types.ModuleType('ollama'),
-    'mcp': types.ModuleType('mcp'),
-    'numpy': types.ModuleType('numpy'),
-}
-
-# Add to sys.modules
-for name, module in mock_modules.items():
-    sys.modules[name] = module
-
-# Now import config directly
+# config.py only needs python-dotenv, so it imports without the voice/LLM stack
 from config import Config
 
 
@@ -52,18 +33,15 @@ class TestConfigDirect:
     })
     def test_config_values_from_env(self):
         """Test that config values are loaded from environment variables"""
-        # Reload config to pick up new env vars
-        import importlib
-        import config
-        importlib.reload(config)
-        Config = config.Config
+        # A fresh instance reads the patched env vars; no module reload needed
+        config = Config.from_env()
         
-        assert Config.STT_MODEL == 'base'
-        assert Config.LLM_MODEL == 'test-model'
-        assert Config.TTS_MODEL_ONNX == 'test.onnx'
-        assert Config.TTS_MODEL_JSON == 'test.json'
-        assert Config.SUPERMCP_SERVER_PATH == 'SuperMCP/SuperMCP.py'
-        assert Config.SUPERMCP_TIMEOUT == 60
+        assert config.STT_MODEL == 'base'
+        assert config.LLM_MODEL == 'test-model'
+        assert config.TTS_MODEL_ONNX == 'test.onnx'
+        assert config.TTS_MODEL_JSON == 'test.json'
+        assert config.SUPERMCP_SERVER_PATH == 'SuperMCP/SuperMCP.py'
+        assert config.SUPERMCP_TIMEOUT == 60
 
     def test_llm_rule_content(self):
         """Test LLM_RULE content"""
@@ -117,20 +95,17 @@ class TestConfigDirect:
                 del os.environ[var]
         
         try:
-            # Reload config to pick up cleared env vars
-            import importlib
-            import config
-            importlib.reload(config)
-            Config = config.Config
+            # A fresh instance reads the cleared env vars
+            config = Config.from_env()
             
             # These values come from environment variables, so they may have defaults
             # We just check that they exist and are strings (or None)
-            assert isinstance(Config.STT_MODEL, (str, type(None)))
-            assert isinstance(Config.LLM_MODEL, (str, type(None)))
-            assert isinstance(Config.TTS_MODEL_ONNX, (str, type(None)))
-            assert isinstance(Config.TTS_MODEL_JSON, (str, type(None)))
-            assert Config.SUPERMCP_SERVER_PATH == 'SuperMCP/SuperMCP.py'
-            assert Config.SUPERMCP_TIMEOUT == 60
+            assert isinstance(config.STT_MODEL, (str, type(None)))
+            assert isinstance(config.LLM_MODEL, (str, type(None)))
+            assert isinstance(config.TTS_MODEL_ONNX, (str, type(None)))
+            assert isinstance(config.TTS_MODEL_JSON, (str, type(None)))
+            assert config.SUPERMCP_SERVER_PATH == 'SuperMCP/SuperMCP.py'
+            assert config.SUPERMCP_TIMEOUT == 60
             
         finally:
             # Restore original values
@@ -0,0 +1,152 @@
+"""
+Unit tests for jarvis.llm (history window and streamed output sentences)
+"""
+
+import pytest
+
+pytest.importorskip("ollama")
+
+from jarvis.config import Config
+from jarvis.llm import LLM, _OutputStreamer
+
+REPLY = '{"user_request": "Conversation", "output": "Hello."}'
+
+
+def make_llm(monkeypatch, turns):
+    """An LLM with a canned reply and no model preload"""
+    monkeypatch.setattr(Config, "LLM_HISTORY_TURNS", turns)
+    llm = LLM.__new__(LLM)
+    llm.llm_model = "test-model"
+    llm.default_chat = [{'role': 'system', 'content': 'rule'}]
+    llm.chat_history = llm.default_chat[:]
+    llm._chat = lambda streamer=None: REPLY
+    return llm
+
+
+def stream_replies(llm, replies):
+    """Have llm._chat stream each reply in turn, a character at a time, to the streamer ask() passes"""
+    replies = iter(replies)
+
+    def chat(streamer=None):
+        response = next(replies)
+        if streamer:
+            for end in range(1, len(response) + 1):
+                streamer.feed(response[:end])
+        return response
+    llm._chat = chat
+
+
+def stream(chunks):
+    """Feed chunks to an _OutputStreamer the way LLM._chat does; return the sentences sent"""
+    sentences = []
+    streamer = _OutputStreamer(sentences.append)
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        streamer.feed(buffer)
+    return sentences
+
+
+class TestHistoryWindow:
+    """LLM_HISTORY_TURNS caps the chat history"""
+
+    @pytest.mark.parametrize("turns, lengths", [
+        (0, [3, 3, 3]),
+        (1, [3, 5, 5]),
+        (3, [3, 5, 7, 9, 9]),
+    ])
+    def test_history_length(self, monkeypatch, turns, lengths):
+        """History holds the system prompt, kept turns and the current turn"""
+        llm = make_llm(monkeypatch, turns)
+        for expected in lengths:
+            assert llm.ask("hi") == {"user_request": "Conversation", "output": "Hello."}
+            assert len(llm.chat_history) == expected
+            assert [m['role'] for m in llm.chat_history].count('system') == 1
+            assert llm.chat_history[0] is llm.default_chat[0]
+
+    def test_retry_keeps_user_message(self, monkeypatch):
+        """An invalid JSON reply is retried without trimming the turn in progress"""
+        llm = make_llm(monkeypatch, 1)
+        replies = iter(["not json", REPLY])
+        llm._chat = lambda streamer=None: next(replies)
+        llm.ask("first")
+        assert [m['role'] for m in llm.chat_history] == \
+            ['system', 'user', 'assistant', 'user', 'assistant']
+        assert llm.chat_history[1] == {'role': 'user', 'content': 'first'}
+        assert llm.chat_history[-1] == {'role': 'assistant', 'content': REPLY}
+
+
+class TestStreamedAsk:
+    """What ask() reports about output sent through on_partial"""
+
+    def test_streamed_reply(self, monkeypatch):
+        """A Conversation reply streamed in full needs no second presentation"""
+        llm = make_llm(monkeypatch, 1)
+        stream_replies(llm, [REPLY])
+        spoken = []
+        llm.ask("hi", spoken.append, on_discard=spoken.clear)
+        assert spoken == ["Hello."]
+        assert llm.output_streamed
+
+    def test_retry_discards_streamed_text(self, monkeypatch):
+        """Sentences of a reply that gets retried are discarded, not spoken twice"""
+        llm = make_llm(monkeypatch, 1)
+        stream_replies(llm, ['{"user_request": "Conversation", "output": "Hello. World",}', REPLY])
+        spoken = []
+        llm.ask("hi", spoken.append, on_discard=spoken.clear)
+        assert spoken == ["Hello."]
+        assert llm.output_streamed
+
+    def test_undecodable_sentence(self, monkeypatch):
+        """A sentence that doesn't decode stops streaming; the output is said in full instead"""
+        llm = make_llm(monkeypatch, 1)
+        bad = '{"user_request": "Conversation", "output": "Fine. Bad \\x escape. More."}'
+        stream_replies(llm, [bad, REPLY])
+        spoken = []
+        discards = []
+        llm.ask("hi", spoken.append, on_discard=lambda: discards.append(spoken[:]))
+        assert discards == [["Fine."]]
+        assert spoken == ["Fine.", "Hello."]
+        assert llm.output_streamed
+
+    def test_supermcp_reply_not_streamed(self, monkeypatch):
+        """Replies other than Conversation are left to the caller"""
+        llm = make_llm(monkeypatch, 1)
+        stream_replies(llm, ['{"user_request": "SuperMCP", "output": "list_servers()"}'])
+        spoken = []
+        llm.ask("hi", spoken.append)
+        assert spoken == []
+        assert not llm.output_streamed
+
+
+class TestOutputStreamer:
+    """Sentences of a streamed Conversation "output" string"""
+
+    def test_sentences_across_chunks(self):
+        """A sentence boundary split between chunks is found once both halves arrive"""
+        chunks = ['{"user_request": "Conv', 'ersation", "output": "First one', '.', ' Second',
+                  ' one! Th', 'ird"}']
+        assert stream(chunks) == ["First one.", "Second one!", "Third"]
+
+    def test_escaped_quotes(self):
+        """Escaped quotes neither end the output nor appear escaped"""
+        chunks = ['{"user_request": "Conversation", "output": "He said \\',
+                  '"hi\\". Then', ' left."}']
+        assert stream(chunks) == ['He said "hi".', "Then left."]
+
+    def test_decode_failure_stops_streaming(self):
+        """Nothing is sent after a sentence that isn't valid JSON string content"""
+        chunks = ['{"user_request": "Conversation", "output": "One. ', 'Tw\\q. ', 'Three. ', 'Four"}']
+        sentences = []
+        streamer = _OutputStreamer(sentences.append)
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            streamer.feed(buffer)
+        assert sentences == ["One."]
+        assert streamer.failed and streamer.done
+
+    def test_other_requests_not_streamed(self):
+        """Only Conversation replies are spoken while they stream"""
+        chunks = ['{"user_request": "SuperMCP", "output": "list_servers(). x"}']
+        assert stream(chunks) == []